@@ -0,0 +1,96 @@
+"""
+Run every benchmark and print one JSON document.
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --compare baseline.json --max-regression 0.2
+
+With ``--compare`` the exit status is 1 when any result present in the baseline
+lost more than ``--max-regression`` of its ``ops_per_sec``.
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+from . import bench_decode_token, bench_middleware, bench_serializers, bench_user_access
+
+BENCHMARKS = {
+    'decode_token': bench_decode_token,
+    'middleware': bench_middleware,
+    'user_access': bench_user_access,
+    'serializers': bench_serializers,
+}
+
+
+def get_git_revision() -> str | None:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names: list[str], duration: float) -> dict:
+    results = {}
+    for name in names:
+        print(f'running {name} ...', file=sys.stderr)
+        results[name] = BENCHMARKS[name].run(duration)
+    return {
+        'meta': {
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'git_revision': get_git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'duration': duration,
+        },
+        'results': results,
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list[dict]:
+    """
+    Return the results whose throughput dropped more than ``max_regression`` against the baseline.
+    """
+    regressions = []
+    for name, cases in report['results'].items():
+        for case, result in cases.items():
+            baseline_result = baseline.get('results', {}).get(name, {}).get(case)
+            if not baseline_result or not baseline_result.get('ops_per_sec'):
+                continue
+            change = result['ops_per_sec'] / baseline_result['ops_per_sec'] - 1
+            result['change'] = round(change, 3)
+            if change < -max_regression:
+                regressions.append({'benchmark': name, 'case': case, 'change': round(change, 3)})
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=float, default=1.0, help='seconds spent on each case')
+    parser.add_argument('--only', action='append', choices=list(BENCHMARKS), help='run only these benchmarks')
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+    parser.add_argument('--compare', help='baseline JSON report to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='allowed ops_per_sec drop, 0.2 = 20%%')
+    args = parser.parse_args()
+
+    report = run(args.only or list(BENCHMARKS), args.duration)
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            regressions = compare(report, json.load(baseline_file), args.max_regression)
+        report['regressions'] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+    for regression in regressions:
+        print(f"regression: {regression['benchmark']} {regression['case']} {regression['change']:+.1%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
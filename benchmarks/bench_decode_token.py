@@ -0,0 +1,64 @@
+"""
+Tokens verified per second by ``decode_token``.
+
+Compares the previous behaviour (passing the raw JWK set to ``jose.jwt.decode``,
+which rebuilds the key objects on every call) with the pre-parsed ``kid`` lookup
+on every available ``KEYCLOAK_JWT_BACKEND``. The verified-token cache is disabled
+so every round pays for signature verification.
+
+    python -m benchmarks.bench_decode_token
+"""
+import argparse
+import json
+
+from .utils import generate_signing_key, measure, setup_django, sign_token
+
+
+def run(duration: float = 1.0) -> dict:
+    setup_django()
+    from jose import jwt
+
+    from django_keycloak_sso import keycloak
+    from django_keycloak_sso.jwt_backends import JWT_BACKENDS, get_jwt_backend
+
+    private_pem, public_jwk = generate_signing_key('bench-key')
+    _, other_jwk = generate_signing_key('other-key')
+    jwks = {'keys': [other_jwk, public_jwk]}
+    token = sign_token(private_pem, 'bench-key')
+
+    verified_token_cache_size = keycloak._verified_token_cache.maxsize
+    jwt_backend = keycloak._jwt_backend
+    keycloak._verified_token_cache.maxsize = 0
+    keycloak_klass = keycloak.KeyCloakConfidentialClient()
+
+    def raw_jwks_decode():
+        jwt.decode(
+            token,
+            jwks,
+            algorithms=[keycloak_klass.algorithms],
+            audience=keycloak_klass.user_audience,
+        )
+
+    results = {'raw_jwks': measure(raw_jwks_decode, duration=duration)}
+    for backend_name in JWT_BACKENDS:
+        backend = get_jwt_backend(backend_name)
+        keycloak._jwt_backend = backend
+        keycloak._jwks_store.key_loader = backend.load_key
+        keycloak._jwks_store.load(jwks)
+        result = measure(lambda: keycloak_klass.decode_token(token), duration=duration)
+        result['speedup'] = round(result['ops_per_sec'] / results['raw_jwks']['ops_per_sec'], 2)
+        results[f'decode_token[{backend_name}]'] = result
+
+    # Leave the module state as configured for the benchmarks running after this one
+    keycloak._verified_token_cache.maxsize = verified_token_cache_size
+    keycloak._jwt_backend = jwt_backend
+    keycloak._jwks_store.key_loader = jwt_backend.load_key
+    keycloak._jwks_store.load({'keys': []})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=float, default=1.0)
+    args = parser.parse_args()
+    print(json.dumps(run(args.duration), indent=2))
@@ -0,0 +1,65 @@
+"""
+Requests per second through ``KeycloakMiddleware.process_request``.
+
+Covers the eager and lazy ``request.user`` modes with a valid token (verified-token
+cache on and off) and a request carrying an invalid token. Tokens are signed by the
+fake Keycloak realm, whose JWKS is fetched once before measuring.
+
+    python -m benchmarks.bench_middleware
+"""
+import argparse
+import json
+
+from .utils import get_fake_keycloak, measure, setup_django
+
+
+def run(duration: float = 1.0) -> dict:
+    setup_django()
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from django_keycloak_sso import keycloak
+    from django_keycloak_sso.middlewares import KeycloakMiddleware
+
+    token = get_fake_keycloak().issue_user_token('user1', lifetime=3600)
+    factory = RequestFactory()
+    keycloak.KeyCloakConfidentialClient().decode_token(token)
+
+    def process_request(middleware: KeycloakMiddleware, auth_token: str, read_user: bool):
+        request = factory.get('/', HTTP_AUTHORIZATION=f'Bearer {auth_token}')
+        middleware.process_request(request)
+        if read_user:
+            request.user.is_authenticated
+
+    eager = KeycloakMiddleware(lambda request: HttpResponse())
+    eager.lazy_user = False
+    lazy = KeycloakMiddleware(lambda request: HttpResponse())
+    lazy.lazy_user = True
+
+    results = {
+        'process_request[eager]': measure(lambda: process_request(eager, token, True), duration=duration),
+        'process_request[lazy,unread]': measure(lambda: process_request(lazy, token, False), duration=duration),
+        'process_request[lazy,read]': measure(lambda: process_request(lazy, token, True), duration=duration),
+        'process_request[invalid_token]': measure(
+            lambda: process_request(eager, 'not-a-token', True),
+            duration=duration
+        ),
+    }
+    maxsize = keycloak._verified_token_cache.maxsize
+    keycloak._verified_token_cache.maxsize = 0
+    keycloak._verified_token_cache.clear()
+    try:
+        results['process_request[eager,no_token_cache]'] = measure(
+            lambda: process_request(eager, token, True),
+            duration=duration
+        )
+    finally:
+        keycloak._verified_token_cache.maxsize = maxsize
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=float, default=1.0)
+    args = parser.parse_args()
+    print(json.dumps(run(args.duration), indent=2))
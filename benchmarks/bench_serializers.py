@@ -0,0 +1,53 @@
+"""
+Serializer-side SSO data resolution.
+
+``UserSerializer(many=True)`` over a page of users and ``SSOKlass.get_serializer_field_data``
+both from a prefetched list (``get_from_list=True``) and per object detail lookups
+against the fake Keycloak realm.
+
+    python -m benchmarks.bench_serializers
+"""
+import argparse
+import json
+from types import SimpleNamespace
+
+from .utils import get_fake_keycloak, make_user_payload, measure, setup_django
+
+
+def run(duration: float = 1.0, page_size: int = 50) -> dict:
+    setup_django()
+    from django_keycloak_sso.api.serializers import UserSerializer
+    from django_keycloak_sso.sso.sso import SSOKlass
+
+    payloads = [make_user_payload(index) for index in range(page_size)]
+    sso_klass = SSOKlass()
+
+    realm_users = sorted(get_fake_keycloak().realm.users.values(), key=lambda user: user['username'])
+    page_objects = [SimpleNamespace(user=user['id']) for user in realm_users[-page_size:]]
+    list_data = sso_klass.get_sso_data_list(
+        [obj_.user for obj_ in page_objects],
+        'user',
+        SSOKlass.SSOFieldTypeChoices.USER
+    )
+
+    def serialize_from_list():
+        for obj_ in page_objects:
+            sso_klass.get_serializer_field_data('user', SSOKlass.SSOFieldTypeChoices.USER, obj_, list_data, True)
+
+    def serialize_from_detail():
+        for obj_ in page_objects[:10]:
+            sso_klass.get_serializer_field_data('user', SSOKlass.SSOFieldTypeChoices.USER, obj_)
+
+    return {
+        f'UserSerializer[many,{page_size}]': measure(lambda: UserSerializer(payloads, many=True).data, duration=duration),
+        f'get_serializer_field_data[list,{page_size}]': measure(serialize_from_list, duration=duration),
+        'get_serializer_field_data[detail,10]': measure(serialize_from_detail, duration=duration),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=float, default=1.0)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.duration, args.page_size), indent=2))
@@ -0,0 +1,41 @@
+"""
+Calls per second of the ``CustomUser`` role / group accessors and ``check_user_permission_access``.
+
+    python -m benchmarks.bench_user_access
+"""
+import argparse
+import json
+
+from .utils import make_user_payload, measure, setup_django
+
+
+def run(duration: float = 1.0) -> dict:
+    setup_django()
+    from django_keycloak_sso.sso.authentication import CustomUser
+    from django_keycloak_sso.sso.utils import check_user_permission_access
+
+    user = CustomUser(payload=make_user_payload(groups=10), is_authenticated=True)
+
+    results = {}
+    for accessor in ('roles', 'client_roles', 'groups_dict_list', 'group_roles', 'groups_parent'):
+        results[f'CustomUser.{accessor}'] = measure(lambda: getattr(user, accessor), duration=duration)
+
+    scenarios = {
+        'roles': dict(role_titles=['admin'], group_titles=[], group_roles=[]),
+        'groups': dict(role_titles=[], group_titles=['company3', 'company7'], group_roles=[]),
+        'group_roles': dict(role_titles=[], group_titles=['company3'], group_roles=['manager'], match_group_roles=True),
+        'denied': dict(role_titles=['missing'], group_titles=['missing'], group_roles=['missing']),
+    }
+    for name, kwargs in scenarios.items():
+        results[f'check_user_permission_access[{name}]'] = measure(
+            lambda: check_user_permission_access(user, **kwargs),
+            duration=duration
+        )
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=float, default=1.0)
+    args = parser.parse_args()
+    print(json.dumps(run(args.duration), indent=2))
@@ -0,0 +1,115 @@
+import os
+import time
+from typing import Callable
+
+import django
+from django.conf import settings
+
+from django_keycloak_sso.testing.fake_keycloak import FakeKeycloakServer, generate_signing_key
+
+BENCH_REALM = 'bench'
+BENCH_CLIENT_ID = 'bench-back'
+BENCH_CLIENT_SECRET = 'bench-secret'
+BENCH_CLIENT_PK = 'bench-client-pk'
+
+_fake_keycloak: FakeKeycloakServer | None = None
+
+
+def get_fake_keycloak() -> FakeKeycloakServer:
+    """
+    Shared in-process fake Keycloak realm the benchmarks talk to.
+    """
+    global _fake_keycloak
+    if _fake_keycloak is None:
+        _fake_keycloak = FakeKeycloakServer(
+            realm=BENCH_REALM,
+            client_id=BENCH_CLIENT_ID,
+            client_secret=BENCH_CLIENT_SECRET,
+            client_pk=BENCH_CLIENT_PK,
+            seed_users=200,
+            seed_groups=10,
+        ).start()
+    return _fake_keycloak
+
+
+def setup_django(**overrides) -> None:
+    """
+    Configure a minimal in-memory Django project so the package modules can be imported.
+    """
+    if settings.configured:
+        return
+    server_url = os.environ.get('KEYCLOAK_SERVER_URL') or get_fake_keycloak().url
+    options = dict(
+        SECRET_KEY='benchmarks',
+        INSTALLED_APPS=[
+            'django.contrib.contenttypes',
+            'django.contrib.auth',
+            'rest_framework',
+            'django_keycloak_sso',
+        ],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        KEYCLOAK_SERVER_URL=server_url,
+        KEYCLOAK_ISSUER_PREFIX=os.environ.get('KEYCLOAK_ISSUER_PREFIX', server_url),
+        KEYCLOAK_REALM=BENCH_REALM,
+        KEYCLOAK_CLIENT_ID=BENCH_CLIENT_ID,
+        KEYCLOAK_CLIENT_PK=BENCH_CLIENT_PK,
+        KEYCLOAK_CLIENT_TITLE=BENCH_CLIENT_ID,
+        KEYCLOAK_CLIENT_NAME='bench',
+        KEYCLOAK_CLIENT_SECRET=BENCH_CLIENT_SECRET,
+        KEYCLOAK_ALGORITHMS='RS256',
+        ADMIN_GROUPS=[],
+        USE_TZ=True,
+    )
+    options.update(overrides)
+    settings.configure(**options)
+    django.setup()
+
+
+def sign_token(private_pem: bytes, kid: str, **claims) -> str:
+    from jose import jwt
+
+    payload = {
+        'sub': 'bench-user',
+        'aud': 'account',
+        'exp': int(time.time()) + 3600,
+        'preferred_username': 'bench',
+    }
+    payload.update(claims)
+    return jwt.encode(payload, private_pem, algorithm='RS256', headers={'kid': kid})
+
+
+def make_user_payload(index: int = 0, groups: int = 10) -> dict:
+    """
+    Decoded access token claims of a user member of ``groups`` company groups.
+    """
+    return {
+        'sub': f'bench-user-{index}',
+        'preferred_username': f'user{index}',
+        'given_name': 'Bench',
+        'family_name': f'User {index}',
+        'name': f'Bench User {index}',
+        'email': f'user{index}@example.com',
+        'groups': [f'/company{i}/{("managers", "assistants", "employees")[i % 3]}' for i in range(groups)],
+        'realm_access': {'roles': ['offline_access', 'uma_authorization', 'default-roles-markaz', 'auditor']},
+        'resource_access': {BENCH_CLIENT_ID: {'roles': ['admin', 'viewer']}},
+    }
+
+
+def measure(func: Callable, *, duration: float = 1.0, min_rounds: int = 10) -> dict:
+    """
+    Call ``func`` repeatedly for about ``duration`` seconds and return throughput stats.
+    """
+    rounds = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < duration or rounds < min_rounds:
+        func()
+        rounds += 1
+        elapsed = time.perf_counter() - started
+    return {
+        'rounds': rounds,
+        'seconds': round(elapsed, 4),
+        'ops_per_sec': round(rounds / elapsed, 1),
+        'usec_per_op': round(elapsed / rounds * 1_000_000, 2),
+    }
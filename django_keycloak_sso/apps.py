@@ -1,5 +1,24 @@
+import threading
+
 from django.apps import AppConfig
 
 class DjangoKeyCloakSSOConfig(AppConfig):
     name = 'django_keycloak_sso'
     verbose_name = "Django KeyCloak SSO"
+
+    def ready(self):
+        from .keycloak import KeyCloakConfidentialClient
+
+        keycloak_klass = KeyCloakConfidentialClient()
+        keycloak_klass.bootstrap_jwks()
+        if keycloak_klass.jwks_background_refresh:
+            keycloak_klass.jwks_refresher.start()
+        if keycloak_klass.warmup_on_startup:
+            if keycloak_klass.warmup_in_background:
+                threading.Thread(
+                    target=keycloak_klass.warmup,
+                    name='keycloak-warmup',
+                    daemon=True,
+                ).start()
+            else:
+                keycloak_klass.warmup()
@@ -0,0 +1,241 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Type
+
+from asgiref.sync import sync_to_async
+from django.db.models import TextChoices
+from django.utils.translation import gettext_lazy as _
+
+from .http_client import get_async_http_client
+from .circuit_breaker import CircuitBreakerKlass
+from .keycloak import KeyCloakConfidentialClient
+from .metrics import keycloak_metrics
+
+
+class AsyncKeyCloakClient(KeyCloakConfidentialClient):
+    """
+    asyncio counterpart of KeyCloakConfidentialClient.
+
+    ``send_request`` is a coroutine with the same request-type surface. The admin read
+    operations (USERS, GROUPS, USER_GROUPS, USER_ROLES, CLIENT_ROLES) go through a pooled
+    httpx client so many of them can be gathered concurrently; the remaining request
+    types reuse the sync implementation in a worker thread. The service account token
+    is the same cached one the sync client uses.
+    """
+
+    async def send_request(
+            self,
+            request_type: TextChoices,
+            request_type_choices: Type[TextChoices],
+            request_method: KeyCloakConfidentialClient.KeyCloakRequestMethodChoices,
+            panel_type: KeyCloakConfidentialClient.KeyCloakPanelTypeChoices,
+            *args,
+            **kwargs
+    ):
+        self.validate_enums_value(panel_type, self.KeyCloakPanelTypeChoices)
+        self.validate_enums_value(request_type, request_type_choices)
+        self.validate_enums_value(request_method, self.KeyCloakRequestMethodChoices)
+        get_data_method = getattr(self, f'_{request_method.lower()}_{request_type.lower()}')
+        if not get_data_method or not callable(get_data_method):
+            raise self.KeyCloakException("Data get method for keycloak is not valid")
+        if asyncio.iscoroutinefunction(get_data_method):
+            return await get_data_method(*args, **kwargs)
+        return await sync_to_async(get_data_method, thread_sensitive=False)(*args, **kwargs)
+
+    async def aget_cached_access_token(self) -> str:
+        access_token = self._get_memoized_access_token()
+        if access_token:
+            return access_token
+        return await sync_to_async(self.get_cached_access_token, thread_sensitive=False)()
+
+    async def aset_client_access_token(self, headers: dict) -> dict[str, str]:
+        access_token = await self.aget_cached_access_token()
+        headers.update({"Authorization": f"Bearer {access_token}"})
+        return headers
+
+    async def _aget_request_data(
+            self,
+            *,
+            endpoint: str,
+            request_method: KeyCloakConfidentialClient.KeyCloakRequestMethodChoices,
+            post_data: list | dict = None,
+            extra_headers: dict = None,
+            is_admin: bool = False,
+            request_type: str = None
+    ) -> Any:
+        if is_admin:
+            url = f"{self.base_admin_url}{endpoint}"
+        else:
+            url = f"{self.base_panel_url}{endpoint}"
+
+        headers = self._get_headers(extra_headers=extra_headers)
+        request_kwargs = {'headers': headers}
+        if post_data is not None:
+            if 'application/json' in headers.get('Content-Type', '').lower():
+                request_kwargs['json'] = post_data
+            else:
+                request_kwargs['data'] = post_data
+
+        request_type = request_type or 'UNKNOWN'
+        # Only the admin API is guarded, like the sync client
+        circuit_breaker = self.circuit_breaker if is_admin else None
+        if circuit_breaker:
+            try:
+                circuit_breaker.before_call()
+            except CircuitBreakerKlass.CircuitOpenException as e:
+                keycloak_metrics.record_rejected(request_type, type(e).__name__)
+                raise self.KeyCloakCircuitOpenException(e)
+        started = time.monotonic()
+        try:
+            response = await get_async_http_client().request(request_method, url, **request_kwargs)
+        except BaseException as err:
+            # Cancellation included, otherwise a cancelled half open probe never gives its slot back
+            latency = time.monotonic() - started
+            if circuit_breaker:
+                circuit_breaker.record(False, latency)
+            keycloak_metrics.record(request_type, latency, error_class=type(err).__name__)
+            if isinstance(err, Exception):
+                raise self.KeyCloakException(err)
+            raise
+        latency = time.monotonic() - started
+        if circuit_breaker:
+            circuit_breaker.record(response.status_code < 500, latency)
+        keycloak_metrics.record(
+            request_type,
+            latency,
+            status_code=response.status_code,
+            response_bytes=len(response.content),
+        )
+
+        if response.status_code == 404:
+            raise self.KeyCloakNotFoundException(_("Url or object was not found : 404 error"))
+        elif response.status_code == 409:
+            raise self.KeyCloakException("This group already exists.")
+        elif response.is_error:
+            # Same message as the requests HTTPError raised by the sync client
+            error_kind = 'Client' if response.status_code < 500 else 'Server'
+            raise self.KeyCloakException(
+                f"{response.status_code} {error_kind} Error: {response.reason_phrase} for url: {response.url}"
+            )
+        elif response.status_code not in (200, 201, 204):
+            # Same as the sync client, other success statuses carry no data
+            return None
+
+        if not response.content or not response.content.strip():
+            return {"detail": "Request successful"}
+        try:
+            return response.json()
+        except ValueError:
+            return {"detail": "Non-JSON response", "raw": response.text}
+
+    async def _aget_admin_data(
+            self,
+            endpoint: str,
+            error_message: str = None,
+            request_type: str = None,
+            **kwargs
+    ) -> Any:
+        endpoint = self._build_filter_url(base_url=endpoint, **kwargs)
+        extra_headers = {
+            "Content-Type": "application/json"
+        }
+        extra_headers = await self.aset_client_access_token(extra_headers)
+        response_data = await self._aget_request_data(
+            endpoint=endpoint,
+            request_method=self.KeyCloakRequestMethodChoices.GET,
+            extra_headers=extra_headers,
+            post_data=None,
+            is_admin=True,
+            request_type=request_type,
+        )
+        if not response_data and error_message:
+            raise self.KeyCloakException(error_message)
+        return response_data
+
+    async def _get_groups(self, *args, **kwargs) -> dict:
+        return await self._aget_admin_data(
+            "/groups",
+            _("Failed to retrieve groups from Keycloak"),
+            self.KeyCloakRequestTypeChoices.GROUPS,
+            **kwargs
+        )
+
+    async def _get_users(self, *args, **kwargs) -> dict:
+        return await self._aget_admin_data(
+            "/users",
+            _("Failed to retrieve users from Keycloak"),
+            self.KeyCloakRequestTypeChoices.USERS,
+            **kwargs
+        )
+
+    async def _get_user_roles(self, detail_pk: str, *args, **kwargs) -> dict:
+        return await self._aget_admin_data(
+            f"/users/{detail_pk}/role-mappings",
+            _("Failed to retrieve user roles from Keycloak"),
+            self.KeyCloakRequestTypeChoices.USER_ROLES,
+            **kwargs
+        )
+
+    async def _get_user_groups(self, detail_pk: str, *args, **kwargs) -> dict:
+        return await self._aget_admin_data(
+            f"/users/{detail_pk}/groups",
+            _("Failed to retrieve user groups from Keycloak"),
+            self.KeyCloakRequestTypeChoices.USER_GROUPS,
+            **kwargs
+        )
+
+    async def _get_client_roles(self, role_id: str = None):
+        endpoint = f'/clients/{self.client_pk}/roles'
+        if role_id:
+            endpoint = f'/roles-by-id/{role_id}'
+        return await self._aget_admin_data(endpoint, request_type=self.KeyCloakRequestTypeChoices.CLIENT_ROLES)
+
+    async def _aiter_admin_collection(
+            self,
+            endpoint: str,
+            page_size: int,
+            extra_query_params: dict = None,
+            request_type: str = None,
+            max_results: int = None
+    ) -> AsyncIterator[dict]:
+        if page_size <= 0:
+            raise self.KeyCloakException(_("page_size must be a positive number"))
+        first = 0
+        while max_results is None or first < max_results:
+            size = page_size if max_results is None else min(page_size, max_results - first)
+            query_params = dict(extra_query_params or {})
+            query_params.update({'first': first, 'max': size})
+            page = await self._aget_admin_data(
+                endpoint,
+                request_type=request_type,
+                extra_query_params=query_params
+            ) or []
+            for item in page:
+                yield item
+            if len(page) < size:
+                return
+            first += size
+
+    def aiter_users(self, page_size: int = 100, max_results: int = None, **extra_query_params) -> AsyncIterator[dict]:
+        """
+        Async counterpart of ``iter_users``.
+        """
+        return self._aiter_admin_collection(
+            "/users",
+            page_size,
+            extra_query_params,
+            self.KeyCloakRequestTypeChoices.USERS,
+            max_results
+        )
+
+    def aiter_groups(self, page_size: int = 100, max_results: int = None, **extra_query_params) -> AsyncIterator[dict]:
+        """
+        Async counterpart of ``iter_groups``.
+        """
+        return self._aiter_admin_collection(
+            "/groups",
+            page_size,
+            extra_query_params,
+            self.KeyCloakRequestTypeChoices.GROUPS,
+            max_results
+        )
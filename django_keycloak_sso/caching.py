@@ -1,10 +1,38 @@
 import hashlib
-from typing import Any
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
 
 from django.core.cache import cache
 from django.db.models import TextChoices
 
 
+class SSODataList(list):
+    """
+    List of SSO records (users, groups, ...) carrying an ``id`` -> record index.
+
+    The index is built once when the list is created and is pickled with it, so a
+    list stored in the cache resolves any number of ids with dict lookups.
+    ``failed_ids`` holds the requested ids that could not be resolved.
+    """
+
+    def __init__(self, iterable=(), failed_ids: Iterable = ()):
+        super().__init__(iterable)
+        self.failed_ids = frozenset(str(obj_id) for obj_id in failed_ids)
+        self.rebuild_index()
+
+    def rebuild_index(self) -> None:
+        self.id_index = {}
+        for record in self:
+            if isinstance(record, dict) and record.get('id') is not None:
+                # Keep the first record of an id, like a linear scan would
+                self.id_index.setdefault(record['id'], record)
+
+    def get_by_id(self, obj_id: Any, default: Any = None) -> Any:
+        return self.id_index.get(obj_id, default)
+
+
 class SSOCacheControlKlass:
 
     @staticmethod
@@ -24,11 +52,12 @@ class SSOCacheControlKlass:
 
     @staticmethod
     def get_cache_key(field_type: TextChoices, pk: str = None):
-        if pk:
-            cache_key = f"{field_type}_{pk}"
-        else:
-            cache_key = f"{field_type.lower()}s"
-        return cache_key
+        if pk is None:
+            return f"{field_type.lower()}s"
+        if str(pk) == '':
+            # Would otherwise silently point at the whole list key
+            raise ValueError("An empty pk has no cache key")
+        return f"{field_type}_{pk}"
 
     def get_cached_value(self, field_type: TextChoices, pk: str = None) -> Any:
         cache_key = self.get_cache_key(field_type, pk)
@@ -44,3 +73,182 @@ class SSOCacheControlKlass:
     ) -> None:
         cache_key = self.get_cache_key(field_type, pk)
         cache.set(cache_key, value, timeout=timeout)
+
+    def get_many(self, field_type: TextChoices, pks: Iterable[str]) -> dict[str, Any]:
+        """
+        Cached values of many ids of ``field_type`` in a single cache round trip,
+        returned as an id -> value mapping without the ids that are not cached.
+        """
+        cache_keys = {self.get_cache_key(field_type, pk): pk for pk in pks if pk}
+        if not cache_keys:
+            return {}
+        data = cache.get_many(list(cache_keys))
+        return {cache_keys[cache_key]: value for cache_key, value in data.items() if value is not None}
+
+    def set_many(self, field_type: TextChoices, values: dict[str, Any], timeout: int = 3600) -> None:
+        """
+        Store an id -> value mapping of ``field_type`` in a single cache round trip.
+        """
+        if not values:
+            return
+        cache.set_many({self.get_cache_key(field_type, pk): value for pk, value in values.items()}, timeout=timeout)
+
+    @staticmethod
+    def get_stale_cache_key(cache_base_key: str) -> str:
+        return f"sso_stale_{cache_base_key}"
+
+    def get_stale_value(self, cache_base_key: str) -> Any:
+        """
+        Last known good value, kept much longer than the regular cache entries so it
+        can be served while the SSO service is unreachable.
+        """
+        return cache.get(self.get_stale_cache_key(cache_base_key))
+
+    def set_stale_value(
+            self,
+            cache_base_key: str,
+            value: Any,
+            timeout: int = 86400,
+            refresh_interval: int = 0
+    ) -> None:
+        """
+        With ``refresh_interval`` the value is rewritten at most once per interval,
+        for large values (whole lists) that are fetched much more often than they change.
+        """
+        stale_key = self.get_stale_cache_key(cache_base_key)
+        if refresh_interval and not cache.add(f"{stale_key}_written", 1, timeout=refresh_interval):
+            return
+        cache.set(stale_key, value, timeout=timeout)
+
+    def set_many_stale_values(self, values: dict[str, Any], timeout: int = 86400) -> None:
+        """
+        Store many last known values, keyed by their cache base key, in a single cache round trip.
+        """
+        if not values:
+            return
+        cache.set_many(
+            {self.get_stale_cache_key(cache_base_key): value for cache_base_key, value in values.items()},
+            timeout=timeout
+        )
+
+
+class LocalLRUCacheKlass:
+    """
+    Bounded, thread-safe in-process LRU cache whose entries expire at an absolute
+    unix timestamp. Used for hot-path data that must not pay a shared-cache round trip.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash_key(value: str) -> str:
+        return hashlib.sha256(value.encode()).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        if self.maxsize <= 0 or expires_at <= time.time():
+            return
+        with self._lock:
+            self.sets += 1
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'sets': self.sets,
+            'evictions': self.evictions,
+        }
+
+
+class SingleFlightKlass:
+    """
+    Coalesces concurrent calls sharing the same key: the first caller runs the
+    function and every caller arriving while it is in flight gets the same result
+    (or exception) instead of repeating the work.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error: BaseException | None = None
+
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+        self._calls: dict[str, SingleFlightKlass._Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def stats(self) -> dict:
+        return {
+            'in_flight': len(self._calls),
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+        }
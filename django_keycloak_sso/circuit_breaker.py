@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+from django.db.models import TextChoices
+from django.utils.translation import gettext_lazy as _
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreakerKlass:
+    """
+    Failure-rate / latency circuit breaker for calls to a remote service.
+
+    The outcome of the last ``window_size`` calls is kept; a call counts as bad when it
+    fails or takes longer than ``slow_call_threshold`` seconds. Once at least
+    ``minimum_calls`` were recorded and the bad ratio reaches ``failure_rate_threshold``
+    the circuit opens and every call fails fast for ``open_duration`` seconds. After
+    that up to ``half_open_max_calls`` probe calls are let through: a good probe closes
+    the circuit, a bad one opens it again. A probe slot whose outcome was never recorded
+    is given back after ``half_open_probe_timeout`` seconds so a lost probe cannot keep
+    the circuit half open.
+    """
+
+    class CircuitStateChoices(TextChoices):
+        CLOSED = "CLOSED", _("Closed")
+        OPEN = "OPEN", _("Open")
+        HALF_OPEN = "HALF_OPEN", _("Half Open")
+
+    class CircuitOpenException(Exception):
+        pass
+
+    def __init__(
+            self,
+            name: str,
+            enabled: bool = True,
+            failure_rate_threshold: float = 0.5,
+            slow_call_threshold: float = 5.0,
+            window_size: int = 20,
+            minimum_calls: int = 10,
+            open_duration: float = 30.0,
+            half_open_max_calls: int = 1,
+            half_open_probe_timeout: float = None,
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.minimum_calls = minimum_calls
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        self.half_open_probe_timeout = half_open_probe_timeout if half_open_probe_timeout is not None else open_duration
+        self.state = self.CircuitStateChoices.CLOSED
+        self.opened_at: float | None = None
+        self.rejected_calls = 0
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+        self._half_open_calls = 0
+        self._half_open_probe_at = 0.0
+        self._lock = threading.Lock()
+
+    def _open(self) -> None:
+        self.state = self.CircuitStateChoices.OPEN
+        self.opened_at = time.monotonic()
+        self._half_open_calls = 0
+        logger.warning(f"Circuit breaker {self.name} opened")
+
+    def _close(self) -> None:
+        self.state = self.CircuitStateChoices.CLOSED
+        self.opened_at = None
+        self._half_open_calls = 0
+        self._outcomes.clear()
+        logger.info(f"Circuit breaker {self.name} closed")
+
+    def before_call(self) -> None:
+        """
+        Raise CircuitOpenException if the call must not reach the remote service.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.state == self.CircuitStateChoices.OPEN:
+                if time.monotonic() - self.opened_at < self.open_duration:
+                    self.rejected_calls += 1
+                    raise self.CircuitOpenException(f"Circuit breaker {self.name} is open")
+                self.state = self.CircuitStateChoices.HALF_OPEN
+                self._half_open_calls = 0
+            if self.state == self.CircuitStateChoices.HALF_OPEN:
+                if (
+                        self._half_open_calls >= self.half_open_max_calls
+                        and time.monotonic() - self._half_open_probe_at >= self.half_open_probe_timeout
+                ):
+                    logger.warning(f"Circuit breaker {self.name} probe timed out, releasing its slot")
+                    self._half_open_calls = 0
+                if self._half_open_calls >= self.half_open_max_calls:
+                    self.rejected_calls += 1
+                    raise self.CircuitOpenException(f"Circuit breaker {self.name} is half open, probe in progress")
+                self._half_open_calls += 1
+                self._half_open_probe_at = time.monotonic()
+
+    def record(self, success: bool, latency: float) -> None:
+        if not self.enabled:
+            return
+        is_bad = not success or latency >= self.slow_call_threshold
+        with self._lock:
+            if self.state == self.CircuitStateChoices.HALF_OPEN:
+                if is_bad:
+                    self._open()
+                else:
+                    self._close()
+                return
+            if self.state == self.CircuitStateChoices.OPEN:
+                return
+            self._outcomes.append(is_bad)
+            if len(self._outcomes) >= self.minimum_calls:
+                if sum(self._outcomes) / len(self._outcomes) >= self.failure_rate_threshold:
+                    self._open()
+
+    def call(self, func: Callable, *args, is_failure: Callable[[Any], bool] = None, **kwargs) -> Any:
+        """
+        Run ``func`` through the breaker. Raised exceptions (including BaseException
+        such as KeyboardInterrupt) and results matching ``is_failure`` are recorded as failures.
+        """
+        self.before_call()
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            self.record(False, time.monotonic() - started)
+            raise
+        self.record(not (is_failure and is_failure(result)), time.monotonic() - started)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'state': str(self.state),
+            'window_calls': len(self._outcomes),
+            'window_bad_calls': sum(self._outcomes),
+            'rejected_calls': self.rejected_calls,
+        }
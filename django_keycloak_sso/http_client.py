@@ -0,0 +1,124 @@
+import asyncio
+import os
+import threading
+import weakref
+
+import requests
+from django.core.exceptions import ImproperlyConfigured
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .initializer import KeyCloakInitializer
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency, see the "async" extra
+    httpx = None
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+# One pooled async client per running event loop, an httpx client can't be shared across loops
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+# Methods that are safe to replay when Keycloak answers 502/503/504 or the read fails
+RETRY_ALLOWED_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUS_FORCELIST = (502, 503, 504)
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=KeyCloakInitializer.http_max_retries,
+        backoff_factor=KeyCloakInitializer.http_retry_backoff,
+        status_forcelist=RETRY_STATUS_FORCELIST,
+        allowed_methods=RETRY_ALLOWED_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=KeyCloakInitializer.http_pool_connections,
+        pool_maxsize=KeyCloakInitializer.http_pool_maxsize,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """
+    Return the keep-alive session shared by every Keycloak / SSO call of this process.
+    A forked worker builds its own session instead of reusing the parent's sockets.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            _session = _build_session()
+            _session_pid = pid
+    return _session
+
+
+def reset_http_session() -> None:
+    global _session, _session_pid
+    with _session_lock:
+        if _session is not None and _session_pid == os.getpid():
+            _session.close()
+        _session = None
+        _session_pid = None
+
+
+def get_request_timeout() -> tuple[float, float]:
+    return KeyCloakInitializer.http_connect_timeout, KeyCloakInitializer.http_read_timeout
+
+
+def get_async_http_client() -> "httpx.AsyncClient":
+    """
+    Return the pooled keep-alive async client of the running event loop.
+    Requires the optional ``httpx`` dependency (``pip install django-keycloak-sso[async]``).
+    """
+    if httpx is None:
+        raise ImproperlyConfigured("The async Keycloak client requires httpx, install django-keycloak-sso[async]")
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        connect_timeout, read_timeout = get_request_timeout()
+        client = httpx.AsyncClient(
+            verify=False,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=KeyCloakInitializer.http_pool_maxsize,
+                max_keepalive_connections=KeyCloakInitializer.http_pool_maxsize,
+            ),
+            transport=httpx.AsyncHTTPTransport(verify=False, retries=KeyCloakInitializer.http_max_retries),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def get_pool_stats() -> list[dict]:
+    """
+    Connection pool usage of the shared session, one entry per host.
+    """
+    session = _session
+    if session is None or _session_pid != os.getpid():
+        return []
+    stats = []
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for pool_key in list(pools.keys()):
+            pool = pools.get(pool_key)
+            if pool is None:
+                continue
+            stats.append({
+                'host': f"{pool.scheme}://{pool.host}:{pool.port}",
+                'connections_created': pool.num_connections,
+                'requests': pool.num_requests,
+                # The pool queue is pre-filled with None placeholders, only count real sockets
+                'idle_connections': sum(1 for conn in list(pool.pool.queue) if conn) if pool.pool else 0,
+                'maxsize': pool.pool.maxsize if pool.pool else 0,
+            })
+    return stats
@@ -17,3 +17,37 @@ class KeyCloakInitializer:
     issuer = f'{issuer_prefix}/realms/{realm}'
     client_secret = get_settings_value('KEYCLOAK_CLIENT_SECRET')
     admin_groups = get_settings_value('ADMIN_GROUPS')  # list set in env split(',')
+    jwks_ttl = get_settings_value('KEYCLOAK_JWKS_TTL', 3600)
+    jwks_min_refetch_interval = get_settings_value('KEYCLOAK_JWKS_MIN_REFETCH_INTERVAL', 30)
+    verified_token_cache_size = get_settings_value('KEYCLOAK_VERIFIED_TOKEN_CACHE_SIZE', 1024)
+    jwt_backend = get_settings_value('KEYCLOAK_JWT_BACKEND', 'jose')
+    verify_issuer = get_settings_value('KEYCLOAK_VERIFY_ISSUER', False)
+    jwks_bootstrap = get_settings_value('KEYCLOAK_JWKS')
+    jwks_bootstrap_file = get_settings_value('KEYCLOAK_JWKS_FILE')
+    warmup_on_startup = get_settings_value('KEYCLOAK_WARMUP_ON_STARTUP', False)
+    warmup_in_background = get_settings_value('KEYCLOAK_WARMUP_IN_BACKGROUND', True)
+    jwks_background_refresh = get_settings_value('KEYCLOAK_JWKS_BACKGROUND_REFRESH', False)
+    jwks_refresh_interval = get_settings_value('KEYCLOAK_JWKS_REFRESH_INTERVAL', 300)
+    jwks_refresh_jitter = get_settings_value('KEYCLOAK_JWKS_REFRESH_JITTER', 0.1)
+    token_info_cache_size = get_settings_value('KEYCLOAK_TOKEN_INFO_CACHE_SIZE', 1024)
+    token_info_cache_ttl = get_settings_value('KEYCLOAK_TOKEN_INFO_CACHE_TTL', 60)
+    rejected_token_cache_size = get_settings_value('KEYCLOAK_REJECTED_TOKEN_CACHE_SIZE', 1024)
+    rejected_token_cache_ttl = get_settings_value('KEYCLOAK_REJECTED_TOKEN_CACHE_TTL', 30)
+    lazy_user = get_settings_value('KEYCLOAK_LAZY_USER', False)
+    http_pool_connections = get_settings_value('KEYCLOAK_HTTP_POOL_CONNECTIONS', 10)
+    http_pool_maxsize = get_settings_value('KEYCLOAK_HTTP_POOL_MAXSIZE', 20)
+    http_connect_timeout = get_settings_value('KEYCLOAK_HTTP_CONNECT_TIMEOUT', 3.05)
+    http_read_timeout = get_settings_value('KEYCLOAK_HTTP_READ_TIMEOUT', 10)
+    http_max_retries = get_settings_value('KEYCLOAK_HTTP_MAX_RETRIES', 2)
+    http_retry_backoff = get_settings_value('KEYCLOAK_HTTP_RETRY_BACKOFF', 0.3)
+    circuit_breaker_enabled = get_settings_value('KEYCLOAK_CIRCUIT_BREAKER_ENABLED', True)
+    circuit_breaker_failure_rate = get_settings_value('KEYCLOAK_CIRCUIT_BREAKER_FAILURE_RATE', 0.5)
+    circuit_breaker_slow_call_threshold = get_settings_value('KEYCLOAK_CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD', 5)
+    circuit_breaker_window_size = get_settings_value('KEYCLOAK_CIRCUIT_BREAKER_WINDOW_SIZE', 20)
+    circuit_breaker_minimum_calls = get_settings_value('KEYCLOAK_CIRCUIT_BREAKER_MINIMUM_CALLS', 10)
+    circuit_breaker_open_duration = get_settings_value('KEYCLOAK_CIRCUIT_BREAKER_OPEN_DURATION', 30)
+    coalesce_get_requests = get_settings_value('KEYCLOAK_COALESCE_GET_REQUESTS', True)
+    metrics_enabled = get_settings_value('KEYCLOAK_METRICS_ENABLED', True)
+    metrics_hooks = get_settings_value('KEYCLOAK_METRICS_HOOKS', [])
+    service_token_refresh_margin = get_settings_value('KEYCLOAK_SERVICE_TOKEN_REFRESH_MARGIN', 60)
+    service_token_lock_timeout = get_settings_value('KEYCLOAK_SERVICE_TOKEN_LOCK_TIMEOUT', 10)
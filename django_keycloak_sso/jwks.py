@@ -0,0 +1,306 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Callable
+
+from .http_client import get_async_http_client, get_http_session, get_request_timeout, httpx
+from .metrics import keycloak_metrics
+
+logger = logging.getLogger(__name__)
+
+# Same value as KeyCloakConfidentialClient.KeyCloakRequestTypeChoices.JWKS_VERIFY
+JWKS_REQUEST_TYPE = 'JWKS_VERIFY'
+
+
+class JWKSKeyStore:
+    """
+    Thread-safe store of the realm signing keys indexed by ``kid``.
+
+    Keys are fetched lazily from the certs endpoint and kept for ``ttl`` seconds.
+    Each JWK is passed through ``key_loader`` once when the set is loaded, so the
+    verifier key objects are reused for every token instead of being rebuilt.
+    A token signed with an unknown ``kid`` triggers a single refetch (shared by all
+    threads waiting on it and rate limited by ``min_refetch_interval``) so key
+    rotations on Keycloak side are picked up without restarting the process.
+    """
+
+    class JWKSKeyNotFoundException(Exception):
+        pass
+
+    def __init__(
+            self,
+            jwks_url: str,
+            ttl: int = 3600,
+            min_refetch_interval: int = 30,
+            key_loader: Callable[[dict], Any] | None = None,
+    ):
+        self.jwks_url = jwks_url
+        self.key_loader = key_loader
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+        self._jwks: dict = {}
+        self._keys: dict[str | None, Any] = {}
+        self._fetched_at = 0.0
+        self._last_fetch_attempt = 0.0
+        # Only refetches for an unknown kid are rate limited, routine loads do not count
+        self._last_unknown_kid_refetch = 0.0
+        self._lock = threading.Lock()
+        self._async_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # Set while a JWKSRefresher keeps the keys fresh, expired keys are then served
+        # until the refresher swaps them instead of being refetched on the request path
+        self.background_refresh = False
+        self.last_refresh_success_at: float | None = None
+        self.last_refresh_error: Exception | None = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._keys)
+
+    @property
+    def is_expired(self) -> bool:
+        return time.monotonic() - self._fetched_at > self.ttl
+
+    @staticmethod
+    def _record_fetch(started: float, resp=None, error: Exception = None) -> None:
+        keycloak_metrics.record(
+            JWKS_REQUEST_TYPE,
+            time.monotonic() - started,
+            status_code=resp.status_code if resp is not None else None,
+            error_class=type(error).__name__ if error is not None else None,
+            response_bytes=len(resp.content) if resp is not None else 0,
+        )
+
+    def _fetch(self) -> dict:
+        started = time.monotonic()
+        try:
+            resp = get_http_session().get(
+                self.jwks_url,
+                verify=False,
+                timeout=get_request_timeout(),
+            )
+        except Exception as e:
+            self._record_fetch(started, error=e)
+            raise
+        self._record_fetch(started, resp)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def _afetch(self) -> dict:
+        if httpx is None:
+            # No async HTTP client installed, keep the event loop free by fetching in a thread
+            return await asyncio.to_thread(self._fetch)
+        started = time.monotonic()
+        try:
+            resp = await get_async_http_client().get(self.jwks_url)
+        except Exception as e:
+            self._record_fetch(started, error=e)
+            raise
+        self._record_fetch(started, resp)
+        resp.raise_for_status()
+        return resp.json()
+
+    def load(self, jwks: dict) -> None:
+        """
+        Parse and index the given JWK set by ``kid`` and atomically replace the current keys.
+        """
+        keys = {}
+        for key_data in jwks.get('keys', []):
+            if key_data.get('use', 'sig') != 'sig':
+                continue
+            if self.key_loader:
+                try:
+                    key = self.key_loader(key_data)
+                except Exception as e:
+                    logger.warning(f"Skipping unusable JWK {key_data.get('kid')} : {e}")
+                    continue
+            else:
+                key = key_data
+            keys[key_data.get('kid')] = key
+        self._jwks = jwks
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def load_file(self, path: str) -> None:
+        with open(path, encoding='utf-8') as jwks_file:
+            self.load(json.load(jwks_file))
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Refetch the key set. Concurrent callers are coalesced into one request. Non
+        forced refreshes (an unknown kid) are skipped inside ``min_refetch_interval`` of
+        the previous unknown kid refetch. Returns True if this call fetched the keys.
+        """
+        requested_at = time.monotonic()
+        with self._lock:
+            if self._last_fetch_attempt >= requested_at:
+                # Another thread refreshed the keys while we were waiting for the lock
+                return False
+            if not force:
+                if requested_at - self._last_unknown_kid_refetch < self.min_refetch_interval:
+                    return False
+                self._last_unknown_kid_refetch = requested_at
+            try:
+                self.load(self._fetch())
+            except Exception as e:
+                self.last_refresh_error = e
+                raise
+            finally:
+                self._last_fetch_attempt = time.monotonic()
+            self.last_refresh_success_at = time.time()
+            self.last_refresh_error = None
+            return True
+
+    def _get_async_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._async_locks.get(loop)
+        if lock is None:
+            lock = self._async_locks[loop] = asyncio.Lock()
+        return lock
+
+    async def arefresh(self, force: bool = False) -> bool:
+        """
+        Async counterpart of ``refresh`` for use inside an event loop.
+        """
+        requested_at = time.monotonic()
+        async with self._get_async_lock():
+            if self._last_fetch_attempt >= requested_at:
+                return False
+            if not force:
+                if requested_at - self._last_unknown_kid_refetch < self.min_refetch_interval:
+                    return False
+                self._last_unknown_kid_refetch = requested_at
+            try:
+                self.load(await self._afetch())
+            except Exception as e:
+                self.last_refresh_error = e
+                raise
+            finally:
+                self._last_fetch_attempt = time.monotonic()
+            self.last_refresh_success_at = time.time()
+            self.last_refresh_error = None
+            return True
+
+    def _ensure_loaded(self) -> None:
+        if not self._keys:
+            self.refresh(force=True)
+        elif self.is_expired and not self.background_refresh:
+            try:
+                self.refresh(force=True)
+            except Exception as e:
+                # Keep serving the previous keys until the certs endpoint is reachable again
+                logger.warning(f"Failed to refresh JWKS, using cached keys : {e}")
+
+    async def _aensure_loaded(self) -> None:
+        if not self._keys:
+            await self.arefresh(force=True)
+        elif self.is_expired and not self.background_refresh:
+            try:
+                await self.arefresh(force=True)
+            except Exception as e:
+                logger.warning(f"Failed to refresh JWKS, using cached keys : {e}")
+
+    def get_jwks(self) -> dict:
+        self._ensure_loaded()
+        return self._jwks
+
+    def get_key(self, kid: str | None) -> Any:
+        """
+        Return the signing key for ``kid``, refetching the key set once if it is unknown.
+        """
+        self._ensure_loaded()
+        key = self._keys.get(kid)
+        if key is None:
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the current keys, the token is then rejected as signed by an unknown key
+                logger.warning(f"Failed to refetch JWKS for unknown kid {kid} : {e}")
+            key = self._keys.get(kid)
+        if key is None:
+            raise self.JWKSKeyNotFoundException(f"Signing key with kid {kid} was not found")
+        return key
+
+    async def aget_key(self, kid: str | None) -> Any:
+        await self._aensure_loaded()
+        key = self._keys.get(kid)
+        if key is None:
+            try:
+                await self.arefresh()
+            except Exception as e:
+                logger.warning(f"Failed to refetch JWKS for unknown kid {kid} : {e}")
+            key = self._keys.get(kid)
+        if key is None:
+            raise self.JWKSKeyNotFoundException(f"Signing key with kid {kid} was not found")
+        return key
+
+    async def aget_keys(self) -> list:
+        await self._aensure_loaded()
+        return list(self._keys.values())
+
+    def get_keys(self) -> list:
+        self._ensure_loaded()
+        return list(self._keys.values())
+
+
+class JWKSRefresher:
+    """
+    Daemon thread that refetches the key set of a JWKSKeyStore every ``interval``
+    seconds (randomized by ``jitter``) and retries failures with exponential backoff,
+    so the request path never has to wait on the certs endpoint for a TTL refresh.
+    """
+
+    def __init__(self, store: JWKSKeyStore, interval: int = 300, jitter: float = 0.1, max_backoff: int = 300):
+        self.store = store
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    def start(self) -> None:
+        """
+        Start the refresher thread. Safe to call repeatedly, a forked worker gets its own thread.
+        """
+        if self.is_running:
+            return
+        with self._lock:
+            if self.is_running:
+                return
+            self._stop_event.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='keycloak-jwks-refresher', daemon=True)
+            self._thread.start()
+            self.store.background_refresh = True
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.store.background_refresh = False
+
+    def _next_delay(self) -> float:
+        if self.failures:
+            delay = min(self.max_backoff, self.interval, 2 ** self.failures)
+        else:
+            delay = self.interval
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.store.refresh(force=True)
+                self.failures = 0
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Background JWKS refresh failed ({self.failures} in a row) : {e}")
+            self._stop_event.wait(self._next_delay())
@@ -0,0 +1,211 @@
+import time
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+class BaseJWTBackend:
+    """
+    Verifies Keycloak tokens with a specific JWT library.
+
+    Backends only check the signature; registered claims (``exp``, ``nbf``, ``iat``,
+    ``aud`` and ``iss``) are validated here so every backend accepts and rejects the same tokens.
+    """
+
+    class JWTBackendException(Exception):
+        pass
+
+    class JWTExpiredException(JWTBackendException):
+        pass
+
+    class JWTNotYetValidException(JWTBackendException):
+        pass
+
+    name = None
+
+    def load_key(self, key_data: dict) -> Any:
+        """
+        Build the verifier key object for a single JWK.
+        """
+        raise NotImplementedError
+
+    def get_unverified_header(self, token: str) -> dict:
+        raise NotImplementedError
+
+    def get_unverified_claims(self, token: str) -> dict:
+        """
+        Claims of the token without verifying its signature, never use them to authenticate.
+        """
+        raise NotImplementedError
+
+    def verify_signature(self, token: str, key: Any, algorithms: list[str]) -> dict:
+        """
+        Verify the token signature with ``key`` and return its claims without validating them.
+        """
+        raise NotImplementedError
+
+    def decode(
+            self,
+            token: str,
+            key: Any,
+            *,
+            algorithms: list[str],
+            audience: str | None = None,
+            issuer: str | None = None,
+    ) -> dict:
+        keys = key if isinstance(key, (list, tuple)) else [key]
+        if not keys:
+            raise self.JWTBackendException("No signing key is available to verify the token")
+        error = None
+        for key_ in keys:
+            try:
+                claims = self.verify_signature(token, key_, algorithms)
+                break
+            except self.JWTBackendException as e:
+                error = e
+        else:
+            raise error
+        self.validate_claims(claims, audience=audience, issuer=issuer)
+        return claims
+
+    def validate_claims(self, claims: dict, *, audience: str | None = None, issuer: str | None = None) -> None:
+        now = time.time()
+
+        if 'exp' in claims:
+            try:
+                exp = int(claims['exp'])
+            except (TypeError, ValueError):
+                raise self.JWTBackendException("Expiration Time claim (exp) must be an integer.")
+            if exp < now:
+                raise self.JWTExpiredException("Signature has expired.")
+
+        if 'nbf' in claims:
+            try:
+                nbf = int(claims['nbf'])
+            except (TypeError, ValueError):
+                raise self.JWTBackendException("Not Before claim (nbf) must be an integer.")
+            if nbf > now:
+                raise self.JWTNotYetValidException("The token is not yet valid (nbf)")
+
+        if 'iat' in claims:
+            # Only the format is checked, a slightly future iat (clock skew) is accepted
+            if isinstance(claims['iat'], bool) or not isinstance(claims['iat'], (int, float)):
+                raise self.JWTBackendException("Issued At claim (iat) must be a number.")
+
+        if audience and 'aud' in claims:
+            audience_claims = claims['aud']
+            if isinstance(audience_claims, str):
+                audience_claims = [audience_claims]
+            if not isinstance(audience_claims, list) or not all(isinstance(c, str) for c in audience_claims):
+                raise self.JWTBackendException("Invalid claim format in token")
+            if audience not in audience_claims:
+                raise self.JWTBackendException("Invalid audience")
+
+        if issuer and claims.get('iss') != issuer:
+            raise self.JWTBackendException("Invalid issuer")
+
+
+class JoseJWTBackend(BaseJWTBackend):
+    name = 'jose'
+
+    def __init__(self):
+        from jose import exceptions, jwk, jwt
+        self._exceptions = exceptions
+        self._jwk = jwk
+        self._jwt = jwt
+
+    def load_key(self, key_data: dict) -> Any:
+        return self._jwk.construct(key_data, key_data.get('alg'))
+
+    def get_unverified_header(self, token: str) -> dict:
+        try:
+            return self._jwt.get_unverified_header(token)
+        except self._exceptions.JWTError as e:
+            raise self.JWTBackendException(str(e))
+
+    def get_unverified_claims(self, token: str) -> dict:
+        try:
+            return self._jwt.get_unverified_claims(token)
+        except self._exceptions.JWTError as e:
+            raise self.JWTBackendException(str(e))
+
+    def verify_signature(self, token: str, key: Any, algorithms: list[str]) -> dict:
+        try:
+            return self._jwt.decode(
+                token,
+                key,
+                algorithms=algorithms,
+                options={
+                    'verify_aud': False,
+                    'verify_iss': False,
+                    'verify_exp': False,
+                    'verify_nbf': False,
+                    'verify_iat': False,
+                },
+            )
+        except self._exceptions.JWTError as e:
+            raise self.JWTBackendException(str(e))
+
+
+class PyJWTBackend(BaseJWTBackend):
+    name = 'pyjwt'
+
+    def __init__(self):
+        import jwt
+        from jwt.algorithms import has_crypto
+        if not has_crypto:
+            raise ImproperlyConfigured("The pyjwt JWT backend requires the 'cryptography' package")
+        self._jwt = jwt
+
+    def load_key(self, key_data: dict) -> Any:
+        return self._jwt.PyJWK(key_data, key_data.get('alg')).key
+
+    def get_unverified_header(self, token: str) -> dict:
+        try:
+            return self._jwt.get_unverified_header(token)
+        except self._jwt.InvalidTokenError as e:
+            raise self.JWTBackendException(str(e))
+
+    def get_unverified_claims(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, options={'verify_signature': False})
+        except self._jwt.InvalidTokenError as e:
+            raise self.JWTBackendException(str(e))
+
+    def verify_signature(self, token: str, key: Any, algorithms: list[str]) -> dict:
+        try:
+            return self._jwt.decode(
+                token,
+                key,
+                algorithms=algorithms,
+                options={
+                    'verify_aud': False,
+                    'verify_iss': False,
+                    'verify_exp': False,
+                    'verify_nbf': False,
+                    'verify_iat': False,
+                },
+            )
+        except self._jwt.InvalidTokenError as e:
+            raise self.JWTBackendException(str(e))
+
+
+JWT_BACKENDS = {
+    JoseJWTBackend.name: JoseJWTBackend,
+    PyJWTBackend.name: PyJWTBackend,
+}
+
+
+def get_jwt_backend(name: str | None = None) -> BaseJWTBackend:
+    """
+    Instantiate a backend by its short name (``jose`` / ``pyjwt``) or dotted import path.
+    """
+    name = name or JoseJWTBackend.name
+    backend_klass = JWT_BACKENDS.get(name)
+    if backend_klass is None:
+        try:
+            backend_klass = import_string(name)
+        except ImportError:
+            raise ImproperlyConfigured(f"Unknown KEYCLOAK_JWT_BACKEND : {name}")
+    return backend_klass()
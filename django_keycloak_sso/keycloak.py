@@ -1,29 +1,65 @@
 import base64
+import copy
 import datetime
 import hashlib
+import logging
 import os
+import threading
 import time
-from typing import Type, Optional, Any
+from typing import Type, Optional, Any, Iterator
 from urllib.parse import urlencode
 
-import requests
 from django.core.cache import cache
 from django.db.models import TextChoices
 from django.http import HttpRequest
 from django.utils import timezone
 from django.utils.datastructures import MultiValueDict
 from django.utils.translation import gettext_lazy as _
-from jose import exceptions as jose_exceptions
-from jose import jwt
 from requests import HTTPError
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from .caching import LocalLRUCacheKlass, SingleFlightKlass
+from .circuit_breaker import CircuitBreakerKlass
 from .helpers import get_settings_value
+from .http_client import get_http_session, get_request_timeout
 from .initializer import KeyCloakInitializer
-
-_jwks = None
+from .jwks import JWKSKeyStore, JWKSRefresher
+from .jwt_backends import BaseJWTBackend, get_jwt_backend
+from .metrics import KeyCloakMetricsKlass, keycloak_metrics
+
+logger = logging.getLogger(__name__)
+
+_jwt_backend = get_jwt_backend(KeyCloakInitializer.jwt_backend)
+_jwks_store = JWKSKeyStore(
+    KeyCloakInitializer.jwks_url,
+    ttl=KeyCloakInitializer.jwks_ttl,
+    min_refetch_interval=KeyCloakInitializer.jwks_min_refetch_interval,
+    key_loader=_jwt_backend.load_key,
+)
+_jwks_refresher = JWKSRefresher(
+    _jwks_store,
+    interval=KeyCloakInitializer.jwks_refresh_interval,
+    jitter=KeyCloakInitializer.jwks_refresh_jitter,
+)
+_circuit_breaker = CircuitBreakerKlass(
+    'keycloak',
+    enabled=KeyCloakInitializer.circuit_breaker_enabled,
+    failure_rate_threshold=KeyCloakInitializer.circuit_breaker_failure_rate,
+    slow_call_threshold=KeyCloakInitializer.circuit_breaker_slow_call_threshold,
+    window_size=KeyCloakInitializer.circuit_breaker_window_size,
+    minimum_calls=KeyCloakInitializer.circuit_breaker_minimum_calls,
+    open_duration=KeyCloakInitializer.circuit_breaker_open_duration,
+)
+_verified_token_cache = LocalLRUCacheKlass(maxsize=KeyCloakInitializer.verified_token_cache_size)
+_rejected_token_cache = LocalLRUCacheKlass(maxsize=KeyCloakInitializer.rejected_token_cache_size)
+_token_info_cache = LocalLRUCacheKlass(maxsize=KeyCloakInitializer.token_info_cache_size)
+_token_info_single_flight = SingleFlightKlass()
+_request_single_flight = SingleFlightKlass()
+# In-process copy of the service account token, see get_cached_access_token
+_service_token: dict | None = None
+_service_token_lock = threading.Lock()
 
 
 class KeyCloakBaseManager(KeyCloakInitializer):
@@ -33,6 +69,9 @@ class KeyCloakBaseManager(KeyCloakInitializer):
     class KeyCloakNotFoundException(Exception):
         pass
 
+    class KeyCloakCircuitOpenException(KeyCloakException):
+        pass
+
     class KeyCloakGroupRoleChoices(TextChoices):
         MANAGER = "MANAGER", _("Manager")
         ASSISTANT = "ASSISTANT", _("Assistant")
@@ -90,6 +129,89 @@ class KeyCloakBaseManager(KeyCloakInitializer):
             headers.update(extra_headers)
         return headers
 
+    def _send_http_request(self, url: str, request_method: KeyCloakRequestMethodChoices, headers: dict,
+                           post_data: list = None):
+        response = None
+        session = get_http_session()
+        timeout = get_request_timeout()
+
+        if request_method == self.KeyCloakRequestMethodChoices.GET:
+            response = session.get(
+                url,
+                headers=headers,
+                verify=False,
+                timeout=timeout
+            )
+
+        elif request_method == self.KeyCloakRequestMethodChoices.POST:
+
+            content_type = headers.get('Content-Type', '').lower()
+            if 'application/json' in content_type:
+                response = session.post(
+                    url,
+                    json=post_data,
+                    headers=headers,
+                    verify=False,
+                    timeout=timeout
+                )
+            else:
+                response = session.post(
+                    url,
+                    data=post_data,
+                    headers=headers,
+                    verify=False,
+                    timeout=timeout
+                )
+
+        elif request_method == self.KeyCloakRequestMethodChoices.PUT:
+
+            content_type = headers.get('Content-Type', '').lower()
+            if 'application/json' in content_type:
+                response = session.put(
+                    url,
+                    json=post_data,
+                    headers=headers,
+                    verify=False,
+                    timeout=timeout
+                )
+            else:
+                response = session.put(
+                    url,
+                    data=post_data,
+                    headers=headers,
+                    verify=False,
+                    timeout=timeout
+                )
+
+        elif request_method == self.KeyCloakRequestMethodChoices.DELETE:
+
+            response = session.delete(
+                url,
+                data=post_data,
+                headers=headers,
+                verify=False,
+                timeout=timeout
+            )
+        return response
+
+    def _send_tracked_http_request(self, request_type: str | None, *args) -> Any:
+        """
+        ``_send_http_request`` recording the call latency, status and size in the metrics.
+        """
+        started = time.monotonic()
+        try:
+            response = self._send_http_request(*args)
+        except Exception as e:
+            keycloak_metrics.record(request_type or 'UNKNOWN', time.monotonic() - started, error_class=type(e).__name__)
+            raise
+        keycloak_metrics.record(
+            request_type or 'UNKNOWN',
+            time.monotonic() - started,
+            status_code=response.status_code if response is not None else None,
+            response_bytes=len(response.content) if response is not None else 0,
+        )
+        return response
+
     def _get_request_data(
             self,
             *,
@@ -97,68 +219,40 @@ class KeyCloakBaseManager(KeyCloakInitializer):
             request_method: KeyCloakRequestMethodChoices,
             post_data: list = None,
             extra_headers: dict = None,
-            is_admin: bool = False
+            is_admin: bool = False,
+            request_type: str = None
     ) -> Any:
         if is_admin:
             url = f"{self.base_admin_url}{endpoint}"
         else:
             url = f"{self.base_panel_url}{endpoint}"
 
+        def is_failure(response_) -> bool:
+            # Keycloak being unhealthy, not client errors, must open the circuit
+            return response_ is not None and response_.status_code >= 500
+
         try:
-            response = None
             headers = self._get_headers(extra_headers=extra_headers)
-
-            if request_method == self.KeyCloakRequestMethodChoices.GET:
-                response = requests.get(
-                    url,
-                    headers=headers,
-                    verify=False
-                )
-
-            elif request_method == self.KeyCloakRequestMethodChoices.POST:
-
-                content_type = headers.get('Content-Type', '').lower()
-                if 'application/json' in content_type:
-                    response = requests.post(
-                        url,
-                        json=post_data,
-                        headers=headers,
-                        verify=False
-                    )
-                else:
-                    response = requests.post(
-                        url,
-                        data=post_data,
-                        headers=headers,
-                        verify=False
-                    )
-
-            elif request_method == self.KeyCloakRequestMethodChoices.PUT:
-
-                content_type = headers.get('Content-Type', '').lower()
-                if 'application/json' in content_type:
-                    response = requests.put(
-                        url,
-                        json=post_data,
-                        headers=headers,
-                        verify=False
-                    )
-                else:
-                    response = requests.put(
-                        url,
-                        data=post_data,
-                        headers=headers,
-                        verify=False
-                    )
-
-            elif request_method == self.KeyCloakRequestMethodChoices.DELETE:
-
-                response = requests.delete(
-                    url,
-                    data=post_data,
-                    headers=headers,
-                    verify=False
-                )
+            request_args = (
+                self._send_tracked_http_request,
+                request_type,
+                url,
+                request_method,
+                headers,
+                post_data,
+            )
+            request_kwargs = {}
+            if is_admin:
+                # Only the admin API is guarded, a failing admin API must not block logins
+                request_args = (_circuit_breaker.call, *request_args)
+                request_kwargs['is_failure'] = is_failure
+            if request_method == self.KeyCloakRequestMethodChoices.GET and self.coalesce_get_requests:
+                # Concurrent identical GETs (same url and caller token) share one response,
+                # each caller still parses its own copy of the body below
+                coalesce_key = hashlib.sha256(f"{url}|{headers.get('Authorization', '')}".encode()).hexdigest()
+                response = _request_single_flight.do(coalesce_key, *request_args, **request_kwargs)
+            else:
+                response = request_args[0](*request_args[1:], **request_kwargs)
 
             if response is not None:
                 response.raise_for_status()
@@ -171,6 +265,9 @@ class KeyCloakBaseManager(KeyCloakInitializer):
                         return {"detail": "Non-JSON response", "raw": response.text}
 
 
+        except CircuitBreakerKlass.CircuitOpenException as e:
+            keycloak_metrics.record_rejected(request_type or 'UNKNOWN', type(e).__name__)
+            raise self.KeyCloakCircuitOpenException(e)
         except HTTPError as http_err:
             if http_err.response.status_code == 404:
                 raise self.KeyCloakNotFoundException(_("Url or object was not found : 404 error"))
@@ -181,7 +278,7 @@ class KeyCloakBaseManager(KeyCloakInitializer):
 
 
         except Exception as err:
-            print(err)
+            logger.error(f"Keycloak {request_type or ''} request to {endpoint} failed : {err}")
             raise self.KeyCloakException(err)
 
     def send_request(
@@ -244,7 +341,7 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
         'default-roles-markaz',
     ]
     KEYCLOAK_TOKEN_CACHE_KEY = 'keycloak_credentials_client_access_token'
-    KEYCLOAK_TOKEN_EXPIRE_KEY = 'keycloak_credentials_client_access_token_expiry'
+    KEYCLOAK_TOKEN_LOCK_KEY = 'keycloak_credentials_client_access_token_lock'
 
     class KeyCloakRequestTypeChoices(TextChoices):
         CLIENT_CREDENTIALS_ACCESS_TOKEN = "CLIENT_CREDENTIALS_ACCESS_TOKEN", _("Client Credentials Access Token")
@@ -281,32 +378,171 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
         headers.update({"Authorization": f"Bearer {access_token}"})
         return headers
 
+    @property
+    def jwks_store(self) -> JWKSKeyStore:
+        return _jwks_store
+
+    @property
+    def jwks_refresher(self) -> JWKSRefresher:
+        return _jwks_refresher
+
+    @property
+    def jwt_backend(self) -> BaseJWTBackend:
+        return _jwt_backend
+
+    @property
+    def verified_token_cache(self) -> LocalLRUCacheKlass:
+        return _verified_token_cache
+
+    @property
+    def rejected_token_cache(self) -> LocalLRUCacheKlass:
+        return _rejected_token_cache
+
+    @property
+    def token_info_cache(self) -> LocalLRUCacheKlass:
+        return _token_info_cache
+
+    @property
+    def circuit_breaker(self) -> CircuitBreakerKlass:
+        return _circuit_breaker
+
+    @property
+    def request_single_flight(self) -> SingleFlightKlass:
+        return _request_single_flight
+
+    @property
+    def metrics(self) -> KeyCloakMetricsKlass:
+        return keycloak_metrics
+
     def _get_jwks(self):
-        global _jwks
-        if not _jwks:
-            resp = requests.get(
-                self.jwks_url,
-                verify=False,
-                # verify=get_settings_value('ENVIRONMENT') == 'prod',
+        return self.jwks_store.get_jwks()
+
+    def bootstrap_jwks(self) -> bool:
+        """
+        Load the realm keys from KEYCLOAK_JWKS or KEYCLOAK_JWKS_FILE so tokens can be
+        verified before (or without) reaching the certs endpoint.
+        """
+        if self.jwks_bootstrap:
+            self.jwks_store.load(self.jwks_bootstrap)
+        elif self.jwks_bootstrap_file:
+            self.jwks_store.load_file(self.jwks_bootstrap_file)
+        else:
+            return False
+        return True
+
+    def warmup(self) -> None:
+        """
+        Fetch the realm keys and the service account token ahead of the first request.
+        Failures are only logged, the request path fetches them again lazily.
+        """
+        try:
+            if not self.jwks_store.is_loaded:
+                self.jwks_store.refresh(force=True)
+        except Exception as e:
+            logger.warning(f"Keycloak JWKS warmup failed : {e}")
+        try:
+            self.get_cached_access_token()
+        except Exception as e:
+            logger.warning(f"Keycloak service account token warmup failed : {e}")
+
+    def _reject_token(self, token_hash: str, error: Exception, cacheable: bool = True):
+        """
+        Build the rejection of a token, remembered for ``rejected_token_cache_ttl`` only when
+        it is permanent for that exact token (malformed, bad signature, expired).
+        """
+        message = f"Failed to decode token : {str(error)}"
+        if cacheable and not isinstance(error, BaseJWTBackend.JWTNotYetValidException):
+            self.rejected_token_cache.set(
+                token_hash,
+                message,
+                expires_at=time.time() + self.rejected_token_cache_ttl
             )
-            resp.raise_for_status()
-            _jwks = resp.json()
-        return _jwks
+        return self.KeyCloakException(message)
 
-    def decode_token(self, token: str):
-        jwks = self._get_jwks()
+    def _get_token_kid(self, token: str, token_hash: str) -> str | None:
+        if self.jwks_background_refresh and not self.jwks_refresher.is_running:
+            self.jwks_refresher.start()
+        try:
+            return self.jwt_backend.get_unverified_header(token).get('kid')
+        except BaseJWTBackend.JWTBackendException as e:
+            raise self._reject_token(token_hash, e)
+
+    def _get_signing_key(self, token: str, token_hash: str):
+        kid = self._get_token_kid(token, token_hash)
+        if kid is None:
+            try:
+                return self.jwks_store.get_keys()
+            except Exception as e:
+                raise self.KeyCloakException(f"Failed to load signing keys : {str(e)}")
+        try:
+            return self.jwks_store.get_key(kid)
+        except JWKSKeyStore.JWKSKeyNotFoundException as e:
+            # Not cached as rejected, the kid may belong to a key published after the last refetch
+            raise self.KeyCloakException(f"Failed to decode token : {str(e)}")
+        except Exception as e:
+            # The key set could not be loaded at all (certs endpoint unreachable)
+            raise self.KeyCloakException(f"Failed to load signing keys : {str(e)}")
+
+    async def _aget_signing_key(self, token: str, token_hash: str):
+        kid = self._get_token_kid(token, token_hash)
+        if kid is None:
+            try:
+                return await self.jwks_store.aget_keys()
+            except Exception as e:
+                raise self.KeyCloakException(f"Failed to load signing keys : {str(e)}")
+        try:
+            return await self.jwks_store.aget_key(kid)
+        except JWKSKeyStore.JWKSKeyNotFoundException as e:
+            raise self.KeyCloakException(f"Failed to decode token : {str(e)}")
+        except Exception as e:
+            raise self.KeyCloakException(f"Failed to load signing keys : {str(e)}")
+
+    def _get_cached_token_claims(self, token_hash: str) -> dict | None:
+        decoded_content = self.verified_token_cache.get(token_hash)
+        if decoded_content is not None:
+            # Every request gets its own claims, a caller mutating them must not change the cached ones
+            return copy.deepcopy(decoded_content)
+        rejected_message = self.rejected_token_cache.get(token_hash)
+        if rejected_message is not None:
+            raise self.KeyCloakException(rejected_message)
+        return None
+
+    def _verify_token(self, token: str, token_hash: str, key) -> dict:
         try:
-            decoded_content = jwt.decode(
+            decoded_content = self.jwt_backend.decode(
                 token,
-                jwks,
+                key,
                 algorithms=[self.algorithms],
                 audience=self.user_audience,
-                # issuer=self.issuer
+                issuer=self.issuer if self.verify_issuer else None,
             )
-        except (jose_exceptions.JWTError, jose_exceptions.ExpiredSignatureError, jose_exceptions.JWTClaimsError) as e:
-            raise self.KeyCloakException(f"Failed to decode token : {str(e)}")
+        except BaseJWTBackend.JWTBackendException as e:
+            # Without a kid the token was tried against the current key set, a later key may still verify it
+            raise self._reject_token(token_hash, e, cacheable=not isinstance(key, (list, tuple)))
+        if decoded_content.get('exp'):
+            self.verified_token_cache.set(token_hash, copy.deepcopy(decoded_content), expires_at=decoded_content['exp'])
         return decoded_content
 
+    def decode_token(self, token: str):
+        token_hash = self.verified_token_cache.hash_key(token)
+        decoded_content = self._get_cached_token_claims(token_hash)
+        if decoded_content is not None:
+            return decoded_content
+        key = self._get_signing_key(token, token_hash)
+        return self._verify_token(token, token_hash, key)
+
+    async def adecode_token(self, token: str):
+        """
+        Async counterpart of ``decode_token``: verification runs in the event loop
+        against the cached key store, only a key refetch awaits the certs endpoint.
+        """
+        token_hash = self.verified_token_cache.hash_key(token)
+        decoded_content = self._get_cached_token_claims(token_hash)
+        if decoded_content is not None:
+            return decoded_content
+        key = await self._aget_signing_key(token, token_hash)
+        return self._verify_token(token, token_hash, key)
+
     @staticmethod
     def set_httponly_cookie(key: str, value: str, response: Optional[Response] = None, *args, **kwargs) -> Response:
         if not response:
@@ -326,14 +562,103 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
         )
         return response
 
+    @staticmethod
+    def _is_usable_service_token(token_data: Any, fresh: bool = False) -> bool:
+        if not isinstance(token_data, dict):
+            return False
+        return time.time() < token_data['refresh_at' if fresh else 'expires_at']
+
+    def _get_memoized_access_token(self) -> str | None:
+        token_data = _service_token
+        if self._is_usable_service_token(token_data, fresh=True):
+            return token_data['access_token']
+        return None
+
     def get_cached_access_token(self):
-        access_token = cache.get(self.KEYCLOAK_TOKEN_CACHE_KEY)
-        expiry_time = cache.get(self.KEYCLOAK_TOKEN_EXPIRE_KEY)
-        if access_token and expiry_time and expiry_time > time.time():
+        """
+        Service account token, served from an in-process memo until its refresh time.
+        Between the refresh time and the expiry the current token is still returned while
+        a background thread fetches the next one, so only a cold start or an expired
+        token makes the caller wait on a token grant.
+        """
+        global _service_token
+        access_token = self._get_memoized_access_token()
+        if access_token:
             return access_token
-        return self._post_client_credentials_access_token()
+        token_data = _service_token
+        if not self._is_usable_service_token(token_data):
+            token_data = cache.get(self.KEYCLOAK_TOKEN_CACHE_KEY)
+            if not self._is_usable_service_token(token_data):
+                return self._refresh_service_token(blocking=True)['access_token']
+            _service_token = token_data
+        if not self._is_usable_service_token(token_data, fresh=True):
+            self._schedule_service_token_refresh()
+        return token_data['access_token']
+
+    def _schedule_service_token_refresh(self) -> None:
+        # Taken here, not in the thread, so concurrent callers start a single refresh thread
+        if not _service_token_lock.acquire(blocking=False):
+            return
+
+        def refresh():
+            try:
+                self._refresh_locked_service_token(blocking=False)
+            except Exception as e:
+                logger.warning(f"Background refresh of the Keycloak service account token failed : {e}")
+            finally:
+                _service_token_lock.release()
+
+        try:
+            threading.Thread(target=refresh, name='keycloak-service-token-refresh', daemon=True).start()
+        except BaseException:
+            _service_token_lock.release()
+            raise
+
+    def _refresh_service_token(self, blocking: bool = True) -> dict | None:
+        """
+        Fetch a new service account token. Threads of this process are serialized by a
+        lock and workers by a lock key added to the shared cache, so a single token grant
+        is made; the others pick up the token it publishes.
+        """
+        if not _service_token_lock.acquire(blocking=blocking):
+            return _service_token
+        try:
+            return self._refresh_locked_service_token(blocking)
+        finally:
+            _service_token_lock.release()
+
+    def _refresh_locked_service_token(self, blocking: bool) -> dict | None:
+        """
+        Body of ``_refresh_service_token``, the caller holds ``_service_token_lock``.
+        """
+        global _service_token
+        for token_data in (_service_token, cache.get(self.KEYCLOAK_TOKEN_CACHE_KEY)):
+            if self._is_usable_service_token(token_data, fresh=True):
+                # Refreshed by another thread or worker while we were waiting
+                _service_token = token_data
+                return token_data
+
+        lock_acquired = cache.add(self.KEYCLOAK_TOKEN_LOCK_KEY, os.getpid(), timeout=self.service_token_lock_timeout)
+        if not lock_acquired:
+            if not blocking:
+                return _service_token
+            deadline = time.monotonic() + self.service_token_lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                token_data = cache.get(self.KEYCLOAK_TOKEN_CACHE_KEY)
+                if self._is_usable_service_token(token_data, fresh=True):
+                    _service_token = token_data
+                    return token_data
+            # The worker holding the lock did not publish a token in time, fetch it ourselves
+        try:
+            self._post_client_credentials_access_token()
+        finally:
+            if lock_acquired:
+                cache.delete(self.KEYCLOAK_TOKEN_LOCK_KEY)
+        return _service_token
 
     def _post_client_credentials_access_token(self, *args, **kwargs):
+        global _service_token
         endpoint = "/protocol/openid-connect/token"
         endpoint = self._build_filter_url(base_url=endpoint, **kwargs)
         post_data = {
@@ -346,17 +671,21 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.POST,
             extra_headers=None,
             post_data=post_data,
-            is_admin=False
+            is_admin=False,
+            request_type=self.KeyCloakRequestTypeChoices.CLIENT_CREDENTIALS_ACCESS_TOKEN,
         )
         if response_data:
             access_token = response_data.get('access_token')
             expires_in = response_data.get('expires_in', 300)  # seconds (default 5 mins)
-            cache.set(
-                self.KEYCLOAK_TOKEN_CACHE_KEY,
-                access_token,
-                timeout=expires_in - 30
-            )
-            cache.set(self.KEYCLOAK_TOKEN_EXPIRE_KEY, time.time() + expires_in - 30, timeout=expires_in - 30)
+            now = time.time()
+            lifetime = max(expires_in - 30, expires_in / 2)
+            token_data = {
+                'access_token': access_token,
+                'expires_at': now + lifetime,
+                'refresh_at': now + max(lifetime - self.service_token_refresh_margin, lifetime / 2),
+            }
+            cache.set(self.KEYCLOAK_TOKEN_CACHE_KEY, token_data, timeout=max(int(lifetime), 1))
+            _service_token = token_data
             return access_token
 
         raise self.KeyCloakException(_("Failed to retrieve data"))
@@ -376,7 +705,8 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.POST,
             extra_headers=None,
             post_data=post_data,
-            is_admin=False
+            is_admin=False,
+            request_type=self.KeyCloakRequestTypeChoices.PASSWORD_ACCESS_TOKEN,
         )
 
         if response_data:
@@ -405,7 +735,8 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.POST,
             extra_headers=None,
             post_data=post_data,
-            is_admin=False
+            is_admin=False,
+            request_type=self.KeyCloakRequestTypeChoices.REFRESH_ACCESS_TOKEN,
         )
 
         if not response_data:
@@ -432,13 +763,92 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.POST,
             extra_headers=None,
             post_data=post_data,
-            is_admin=False
+            is_admin=False,
+            request_type=self.KeyCloakRequestTypeChoices.LOGOUT,
         )
 
         if not response_data:
             raise self.KeyCloakException(_("Failed to retrieve data"))
         return response_data
 
+    def _get_unverified_token_exp(self, token: str) -> float | None:
+        """
+        ``exp`` claim of a token without verifying it, only used to bound cache lifetimes.
+        """
+        try:
+            exp = self.jwt_backend.get_unverified_claims(token).get('exp')
+            return float(exp) if exp is not None else None
+        except (BaseJWTBackend.JWTBackendException, TypeError, ValueError):
+            return None
+
+    def _get_cached_token_info(self, cache_prefix: str, token: str, fetch_method, *args, **kwargs) -> dict:
+        """
+        Serve introspection / userinfo results from the in-process cache and let
+        concurrent requests carrying the same token share a single Keycloak call.
+        """
+        cache_key = f"{cache_prefix}_{self.token_info_cache.hash_key(token)}"
+        response_data = self.token_info_cache.get(cache_key)
+        if response_data is not None:
+            return response_data
+        return _token_info_single_flight.do(cache_key, fetch_method, token, cache_key, *args, **kwargs)
+
+    def _post_introspect_token(self, token: str, *args, **kwargs) -> dict:
+        return self._get_cached_token_info('introspect', token, self._fetch_introspect_token, **kwargs)
+
+    def _fetch_introspect_token(self, token: str, cache_key: str, *args, **kwargs) -> dict:
+        endpoint = "/protocol/openid-connect/token/introspect"
+        endpoint = self._build_filter_url(base_url=endpoint, **kwargs)
+        post_data = {
+            "token": token,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+        }
+        response_data = self._get_request_data(
+            endpoint=endpoint,
+            request_method=self.KeyCloakRequestMethodChoices.POST,
+            extra_headers=None,
+            post_data=post_data,
+            is_admin=False,
+            request_type=self.KeyCloakRequestTypeChoices.INTROSPECT_TOKEN,
+        )
+        if not response_data:
+            raise self.KeyCloakException(_("Failed to retrieve data"))
+
+        # Never keep an introspection result past the token expiry
+        expires_at = time.time() + self.token_info_cache_ttl
+        if response_data.get('active') and response_data.get('exp'):
+            expires_at = min(expires_at, response_data['exp'])
+        self.token_info_cache.set(cache_key, response_data, expires_at=expires_at)
+        return response_data
+
+    def _get_user_info(self, token: str, *args, **kwargs) -> dict:
+        return self._get_cached_token_info('userinfo', token, self._fetch_user_info, **kwargs)
+
+    def _fetch_user_info(self, token: str, cache_key: str, *args, **kwargs) -> dict:
+        endpoint = "/protocol/openid-connect/userinfo"
+        endpoint = self._build_filter_url(base_url=endpoint, **kwargs)
+        extra_headers = {
+            "Authorization": f"Bearer {token}"
+        }
+        response_data = self._get_request_data(
+            endpoint=endpoint,
+            request_method=self.KeyCloakRequestMethodChoices.GET,
+            extra_headers=extra_headers,
+            post_data=None,
+            is_admin=False,
+            request_type=self.KeyCloakRequestTypeChoices.USER_INFO,
+        )
+        if not response_data:
+            raise self.KeyCloakException(_("Failed to retrieve user info from Keycloak"))
+
+        # Like introspection results, never keep user info past the token expiry
+        expires_at = time.time() + self.token_info_cache_ttl
+        token_exp = self._get_unverified_token_exp(token)
+        if token_exp:
+            expires_at = min(expires_at, token_exp)
+        self.token_info_cache.set(cache_key, response_data, expires_at=expires_at)
+        return response_data
+
     def _get_groups(self , *args, **kwargs) -> dict:
         """
         Retrieves all groups from Keycloak using the Admin REST API.
@@ -455,7 +865,8 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.GET,
             extra_headers=extra_headers,
             post_data=None,
-            is_admin=True
+            is_admin=True,
+            request_type=self.KeyCloakRequestTypeChoices.GROUPS,
         )
 
         if not response_data:
@@ -479,7 +890,8 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.GET,
             extra_headers=extra_headers,
             post_data=None,
-            is_admin=True
+            is_admin=True,
+            request_type=self.KeyCloakRequestTypeChoices.USERS,
         )
 
         if not response_data:
@@ -487,6 +899,76 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
 
         return response_data
 
+    def _get_admin_page(
+            self,
+            endpoint: str,
+            first: int,
+            page_size: int,
+            extra_query_params: dict = None,
+            request_type: str = None
+    ) -> list:
+        query_params = dict(extra_query_params or {})
+        query_params.update({'first': first, 'max': page_size})
+        extra_headers = {
+            "Content-Type": "application/json"
+        }
+        extra_headers = self.set_client_access_token(extra_headers)
+        # An empty page is a valid answer here, it marks the end of the collection
+        return self._get_request_data(
+            endpoint=self._build_filter_url(base_url=endpoint, extra_query_params=query_params),
+            request_method=self.KeyCloakRequestMethodChoices.GET,
+            extra_headers=extra_headers,
+            post_data=None,
+            is_admin=True,
+            request_type=request_type,
+        ) or []
+
+    def _iter_admin_collection(
+            self,
+            endpoint: str,
+            page_size: int,
+            extra_query_params: dict = None,
+            request_type: str = None,
+            max_results: int = None
+    ) -> Iterator[dict]:
+        if page_size <= 0:
+            raise self.KeyCloakException(_("page_size must be a positive number"))
+        first = 0
+        while max_results is None or first < max_results:
+            # The last page is shrunk so no more than max_results objects are fetched
+            size = page_size if max_results is None else min(page_size, max_results - first)
+            page = self._get_admin_page(endpoint, first, size, extra_query_params, request_type)
+            yield from page
+            if len(page) < size:
+                return
+            first += size
+
+    def iter_users(self, page_size: int = 100, max_results: int = None, **extra_query_params) -> Iterator[dict]:
+        """
+        Lazily yield every user of the realm (at most ``max_results`` of them), fetching
+        ``page_size`` users per request with Keycloak ``first`` / ``max`` paging. Extra
+        keyword arguments are sent as query params (``search``, ``briefRepresentation``, ...).
+        """
+        return self._iter_admin_collection(
+            "/users",
+            page_size,
+            extra_query_params,
+            self.KeyCloakRequestTypeChoices.USERS,
+            max_results
+        )
+
+    def iter_groups(self, page_size: int = 100, max_results: int = None, **extra_query_params) -> Iterator[dict]:
+        """
+        Lazily yield the top level groups of the realm, see ``iter_users``.
+        """
+        return self._iter_admin_collection(
+            "/groups",
+            page_size,
+            extra_query_params,
+            self.KeyCloakRequestTypeChoices.GROUPS,
+            max_results
+        )
+
     def _get_find_group(self , group_name):
         endpoint = f"/groups"
 
@@ -504,7 +986,8 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.GET,
             extra_headers=extra_headers,
             post_data=None,
-            is_admin=True
+            is_admin=True,
+            request_type=self.KeyCloakRequestTypeChoices.FIND_GROUP,
         )
         return response_data
 
@@ -528,7 +1011,8 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.GET,
             extra_headers=extra_headers,
             post_data=None,
-            is_admin=True
+            is_admin=True,
+            request_type=self.KeyCloakRequestTypeChoices.USER_ROLES,
         )
 
         if not response_data:
@@ -554,11 +1038,12 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.GET,
             extra_headers=extra_headers,
             post_data=None,
-            is_admin=True
+            is_admin=True,
+            request_type=self.KeyCloakRequestTypeChoices.USER_GROUPS,
         )
 
         if not response_data:
-            raise self.KeyCloakException(_("Failed to retrieve user roles from Keycloak"))
+            raise self.KeyCloakException(_("Failed to retrieve user groups from Keycloak"))
 
         return response_data
 
@@ -583,7 +1068,8 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.POST,
             extra_headers=extra_headers,
             post_data=data,
-            is_admin=True
+            is_admin=True,
+            request_type=self.KeyCloakRequestTypeChoices.GROUPS,
         )
         return response_data
 
@@ -599,7 +1085,8 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.DELETE,
             extra_headers=extra_headers,
             post_data=None,
-            is_admin=True
+            is_admin=True,
+            request_type=self.KeyCloakRequestTypeChoices.GROUPS,
         )
         return response_data
 
@@ -619,7 +1106,8 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.GET,
             extra_headers=extra_headers,
             post_data=None,
-            is_admin=True
+            is_admin=True,
+            request_type=self.KeyCloakRequestTypeChoices.CLIENT_ROLES,
         )
         return response_data
 
@@ -648,7 +1136,8 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.POST,
             extra_headers=extra_headers,
             post_data=data,
-            is_admin=True
+            is_admin=True,
+            request_type=self.KeyCloakRequestTypeChoices.ASSIGN_ROLE_GROUP,
         )
         return response_data
 
@@ -665,7 +1154,8 @@ class KeyCloakConfidentialClient(KeyCloakBaseManager):
             request_method=self.KeyCloakRequestMethodChoices.PUT,
             extra_headers=extra_headers,
             post_data=None,
-            is_admin=True
+            is_admin=True,
+            request_type=self.KeyCloakRequestTypeChoices.USER_JOIN_GROUP,
         )
         return response_data
 
@@ -0,0 +1,168 @@
+import logging
+import threading
+from bisect import bisect_left
+from typing import Any
+
+from django.utils.module_loading import import_string
+
+from .initializer import KeyCloakInitializer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class BaseMetricsHook:
+    """
+    Receives every recorded Keycloak call. Subclass it to export the metrics
+    (Prometheus, StatsD, logs, ...) and list its dotted path in KEYCLOAK_METRICS_HOOKS.
+    """
+
+    def on_request(
+            self,
+            *,
+            request_type: str,
+            latency: float,
+            status_code: int | None,
+            error_class: str | None,
+            response_bytes: int,
+    ) -> None:
+        """
+        Called after every call that reached Keycloak (or failed on the way).
+        """
+        pass
+
+    def on_rejected(self, *, request_type: str, reason: str) -> None:
+        """
+        Called for a call that never left the process (e.g. the circuit breaker is open).
+        """
+        pass
+
+
+class KeyCloakMetricsKlass:
+    """
+    Thread-safe in-process aggregation of outbound Keycloak calls per request type :
+    call / error counts, status codes, error classes, response bytes and a latency
+    histogram. ``snapshot()`` returns the current values, hooks get every single call.
+    """
+
+    def __init__(
+            self,
+            enabled: bool = True,
+            buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+            hooks: list[str | BaseMetricsHook] = None,
+    ):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self._hook_paths = list(hooks or [])
+        self._hooks: list[BaseMetricsHook] | None = None
+        self._data: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def hooks(self) -> list[BaseMetricsHook]:
+        # Resolved on first use so hook modules may import this package
+        if self._hooks is None:
+            hooks = []
+            for hook in self._hook_paths:
+                if isinstance(hook, str):
+                    hook = import_string(hook)
+                if isinstance(hook, type):
+                    hook = hook()
+                hooks.append(hook)
+            self._hooks = hooks
+        return self._hooks
+
+    def add_hook(self, hook: BaseMetricsHook) -> None:
+        self.hooks.append(hook)
+
+    def _get_entry(self, request_type: str) -> dict:
+        entry = self._data.get(request_type)
+        if entry is None:
+            entry = self._data[request_type] = {
+                'count': 0,
+                'errors': 0,
+                'rejected': 0,
+                'error_classes': {},
+                'status_codes': {},
+                'response_bytes': 0,
+                'latency_sum': 0.0,
+                'latency_max': 0.0,
+                'latency_buckets': [0] * (len(self.buckets) + 1),
+            }
+        return entry
+
+    def _call_hooks(self, method_name: str, **kwargs) -> None:
+        for hook in self.hooks:
+            try:
+                getattr(hook, method_name)(**kwargs)
+            except Exception:
+                logger.exception(f"Keycloak metrics hook {hook!r} failed")
+
+    def record(
+            self,
+            request_type: str,
+            latency: float,
+            status_code: int | None = None,
+            error_class: str | None = None,
+            response_bytes: int = 0,
+    ) -> None:
+        if not self.enabled:
+            return
+        request_type = str(request_type)
+        with self._lock:
+            entry = self._get_entry(request_type)
+            entry['count'] += 1
+            if error_class or (status_code is not None and status_code >= 400):
+                entry['errors'] += 1
+            if error_class:
+                entry['error_classes'][error_class] = entry['error_classes'].get(error_class, 0) + 1
+            if status_code is not None:
+                entry['status_codes'][status_code] = entry['status_codes'].get(status_code, 0) + 1
+            entry['response_bytes'] += response_bytes
+            entry['latency_sum'] += latency
+            entry['latency_max'] = max(entry['latency_max'], latency)
+            entry['latency_buckets'][bisect_left(self.buckets, latency)] += 1
+        self._call_hooks(
+            'on_request',
+            request_type=request_type,
+            latency=latency,
+            status_code=status_code,
+            error_class=error_class,
+            response_bytes=response_bytes,
+        )
+
+    def record_rejected(self, request_type: str, reason: str) -> None:
+        if not self.enabled:
+            return
+        request_type = str(request_type)
+        with self._lock:
+            self._get_entry(request_type)['rejected'] += 1
+        self._call_hooks('on_rejected', request_type=request_type, reason=reason)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """
+        Current metrics per request type, latency bucket keys are the upper bounds in seconds.
+        """
+        bucket_labels = [str(bucket) for bucket in self.buckets] + ['+Inf']
+        with self._lock:
+            snapshot = {}
+            for request_type, entry in self._data.items():
+                snapshot[request_type] = {
+                    **entry,
+                    'error_classes': dict(entry['error_classes']),
+                    'status_codes': dict(entry['status_codes']),
+                    'latency_avg': entry['latency_sum'] / entry['count'] if entry['count'] else 0.0,
+                    'latency_buckets': dict(zip(bucket_labels, entry['latency_buckets'])),
+                }
+            return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+keycloak_metrics = KeyCloakMetricsKlass(
+    enabled=KeyCloakInitializer.metrics_enabled,
+    hooks=KeyCloakInitializer.metrics_hooks,
+)
@@ -1,43 +1,126 @@
+from functools import partial
+
 from django.contrib.auth.models import AnonymousUser
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
 from jose import JWTError
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
 from django_keycloak_sso.sso.authentication import CustomUser
+from django_keycloak_sso.sso.identity_map import identity_map_scope
 from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
 
 
-class KeycloakAuthentication(BaseAuthentication):
-    def authenticate(self, request):
-        keycloak_klass = KeyCloakConfidentialClient()
-        token = keycloak_klass.get_token(request, 'access_token')
-        # token = keycloak_klass.get_token_from_header(request)
-        if not token:
-            return None
+def _authenticate_request(request) -> tuple[str | None, CustomUser | None, str | None]:
+    """
+    Decode the request access token once and memoize ``(token, user, error)`` on the
+    underlying HttpRequest, so the middleware and DRF authentication share the result.
+    """
+    http_request = getattr(request, '_request', request)
+    auth_result = getattr(http_request, '_keycloak_auth', None)
+    if auth_result is not None:
+        return auth_result
+
+    keycloak_klass = KeyCloakConfidentialClient()
+    token = keycloak_klass.get_token(http_request, 'access_token')
+    user = None
+    error = None
+    if token:
         try:
             payload = keycloak_klass.decode_token(token)
             user = CustomUser(
                 is_authenticated=True,
                 payload=payload
             )
-            return user, None
         except KeyCloakConfidentialClient.KeyCloakException as e:
-            raise AuthenticationFailed(f"Invalid token: {str(e)}")
+            error = str(e)
+    auth_result = (token, user, error)
+    http_request._keycloak_auth = auth_result
+    return auth_result
+
+
+async def _aauthenticate_request(request) -> tuple[str | None, CustomUser | None, str | None]:
+    http_request = getattr(request, '_request', request)
+    auth_result = getattr(http_request, '_keycloak_auth', None)
+    if auth_result is not None:
+        return auth_result
+
+    keycloak_klass = KeyCloakConfidentialClient()
+    token = keycloak_klass.get_token(http_request, 'access_token')
+    user = None
+    error = None
+    if token:
+        try:
+            payload = await keycloak_klass.adecode_token(token)
+            user = CustomUser(
+                is_authenticated=True,
+                payload=payload
+            )
+        except KeyCloakConfidentialClient.KeyCloakException as e:
+            error = str(e)
+    auth_result = (token, user, error)
+    http_request._keycloak_auth = auth_result
+    return auth_result
+
+
+def get_keycloak_user(request) -> CustomUser | AnonymousUser:
+    _, user, _ = _authenticate_request(request)
+    return user if user is not None else AnonymousUser()
+
+
+async def aget_keycloak_user(request) -> CustomUser | AnonymousUser:
+    _, user, _ = await _aauthenticate_request(request)
+    return user if user is not None else AnonymousUser()
+
+
+class KeycloakAuthentication(BaseAuthentication):
+    def authenticate(self, request):
+        token, user, error = _authenticate_request(request)
+        if not token:
+            return None
+        if error:
+            raise AuthenticationFailed(f"Invalid token: {error}")
+        return user, None
 
 
 class KeycloakMiddleware(MiddlewareMixin):
+    lazy_user = KeyCloakConfidentialClient.lazy_user
+
     def process_request(self, request):
-        keycloak_klass = KeyCloakConfidentialClient()
-        token = keycloak_klass.get_token(request, 'access_token')
-        if token:
-            try:
-                payload = keycloak_klass.decode_token(token)
-                request.user = CustomUser(
-                    is_authenticated=True,
-                    payload=payload
-                )
-            except KeyCloakConfidentialClient.KeyCloakException as e:
-                request.user = AnonymousUser()
+        if self.lazy_user:
+            # The token is only verified once something actually reads request.user
+            request.user = SimpleLazyObject(lambda: get_keycloak_user(request))
         else:
-            request.user = AnonymousUser()
+            request.user = get_keycloak_user(request)
+
+    async def __acall__(self, request):
+        """
+        Native async path used under ASGI: the token is verified inside the event loop
+        instead of running process_request in a worker thread. The user is resolved
+        eagerly even with KEYCLOAK_LAZY_USER, a sync lazy user would run a blocking key
+        fetch on the event loop the first time an async view reads ``request.user``.
+        """
+        request.auser = partial(aget_keycloak_user, request)
+        request.user = await aget_keycloak_user(request)
+        return await self.get_response(request)
+
+
+class SSOIdentityMapMiddleware(MiddlewareMixin):
+    """
+    Resolve every SSO user / group id at most once per request : an identity map is
+    active while the request is handled and released when the response is returned.
+    Its hit / miss counts are exposed on ``request.sso_identity_map.stats()``.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with identity_map_scope() as identity_map:
+            request.sso_identity_map = identity_map
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with identity_map_scope() as identity_map:
+            request.sso_identity_map = identity_map
+            return await self.get_response(request)
@@ -197,18 +197,30 @@ class CustomUser(CustomGetterObjectKlass):
         if cached_data is not None:
             return cached_data
 
-        user_group_data = self.keycloak_klass.send_request(
-            self.keycloak_klass.KeyCloakRequestTypeChoices.USER_GROUPS,
-            self.keycloak_klass.KeyCloakRequestTypeChoices,
-            self.keycloak_klass.KeyCloakRequestMethodChoices.GET,
-            self.keycloak_klass.KeyCloakPanelTypeChoices.ADMIN,
-            detail_pk=self.id,
-        )
+        stale_key = self._get_cache_key('groups_id')
+        try:
+            user_group_data = self.keycloak_klass.send_request(
+                self.keycloak_klass.KeyCloakRequestTypeChoices.USER_GROUPS,
+                self.keycloak_klass.KeyCloakRequestTypeChoices,
+                self.keycloak_klass.KeyCloakRequestMethodChoices.GET,
+                self.keycloak_klass.KeyCloakPanelTypeChoices.ADMIN,
+                detail_pk=self.id,
+            )
+        except self.keycloak_klass.KeyCloakException:
+            stale_data = self.sso_cache_klass.get_stale_value(stale_key)
+            if stale_data is None:
+                raise
+            return stale_data
         groups_id_list = []
         for entry in user_group_data:
             # groups_id_list.append(entry['group']['id'])
             groups_id_list.append(entry['parentId'])
         self._set_cache_value('groups_id', groups_id_list, 3600)
+        self.sso_cache_klass.set_stale_value(
+            stale_key,
+            groups_id_list,
+            helpers.get_settings_value('KEYCLOAK_STALE_CACHE_TIMEOUT', 86400)
+        )
         return groups_id_list
 
 
@@ -8,12 +8,18 @@ from django.utils.translation import gettext_lazy as _
 from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
 from django_keycloak_sso.sso.authentication import CustomUser, CustomGroup
 from django_keycloak_sso.sso.helpers import CustomGetterObjectKlass
+from django_keycloak_sso.sso.identity_map import resolve_identity
 from django_keycloak_sso.sso.sso import SSOKlass
 
 sso_klass = SSOKlass()
 
 
 class CustomSSORelatedField(models.CharField):
+    # Resolved objects are cached under the per-id keys SSOKlass uses for this type
+    sso_field_type = None
+    # SSOKlass bulk resolver of this type, the field then shares its batched cache reads / writes
+    sso_bulk_method = None
+
     def __init__(self, *args, **kwargs):
         kwargs.setdefault("max_length", 36)
         super().__init__(*args, **kwargs)
@@ -28,15 +34,35 @@ class CustomSSORelatedField(models.CharField):
 
     def _get_sso_field_value(self, value: str | int, sso_method: str, cache_key: str = None,
                              getter_klass: Any = None) -> Any:
-        class_name = str(self.__class__.__name__).lower()
-        cache_key = cache_key if cache_key else f"{class_name}_{value}"
+        getter_klass = getter_klass if getter_klass else CustomGetterObjectKlass
+        if value is None or str(value) == '':
+            # Nothing to resolve, an empty pk would fetch the whole list
+            return getter_klass(payload=None)
+        # Same id in the same request : resolved and deserialized once
+        return resolve_identity(
+            (sso_method, str(value), getter_klass),
+            lambda: self._resolve_sso_field_value(value, sso_method, cache_key, getter_klass),
+        )
+
+    def _resolve_sso_field_value(self, value: str | int, sso_method: str, cache_key: str = None,
+                                 getter_klass: Any = None) -> Any:
+        getter_klass = getter_klass if getter_klass else CustomGetterObjectKlass
+        if not cache_key and self.sso_bulk_method:
+            # One get_many on a hit, one detail call and one set_many (value and stale copy) on a miss
+            data, errors = getattr(sso_klass, self.sso_bulk_method)([value])
+            return getter_klass(payload=data.get(str(value)))
+        if not cache_key:
+            if self.sso_field_type:
+                cache_key = sso_klass.sso_cache_klass.get_cache_key(self.sso_field_type, value)
+            else:
+                cache_key = f"{str(self.__class__.__name__).lower()}_{value}"
         data = cache.get(cache_key)
 
         if not data:
             # Fetch user data from SSO if not cached
             sso_client = SSOKlass()
             if not hasattr(sso_client, sso_method):
-                raise _("SSO Klass hasn't specified method")
+                raise SSOKlass.SSOKlassException(_("SSO Klass hasn't specified method"))
             try:
                 data = getattr(sso_client, sso_method)(pk=value)
                 cache.set(cache_key, data, timeout=3600)  # Cache for 1 hour
@@ -46,7 +72,6 @@ class CustomSSORelatedField(models.CharField):
                     KeyCloakConfidentialClient.KeyCloakNotFoundException
             ):
                 data = None
-        getter_klass = getter_klass if getter_klass else CustomGetterObjectKlass
         return getter_klass(payload=data)
 
 
@@ -55,6 +80,8 @@ class SSOUserField(CustomSSORelatedField):
     Custom field for storing a user ID as an integer.
     Accepts either an integer ID or a CustomUser instance, storing the extracted ID.
     """
+    sso_field_type = SSOKlass.SSOFieldTypeChoices.USER
+    sso_bulk_method = 'get_users_by_ids'
 
     def get_prep_value(self, value: CustomUser | str) -> str | None:
         """
@@ -95,6 +122,8 @@ class SSOGroupField(CustomSSORelatedField):
     - CustomGroup instance (stores group ID),
     - Integer ID directly.
     """
+    sso_field_type = SSOKlass.SSOFieldTypeChoices.GROUP
+    sso_bulk_method = 'get_groups_by_ids'
 
     def get_prep_value(self, value: CustomUser | CustomGroup | str) -> str | None:
         """
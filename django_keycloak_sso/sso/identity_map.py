@@ -0,0 +1,85 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Hashable, Iterator
+
+logger = logging.getLogger(__name__)
+
+_current_identity_map: ContextVar['SSOIdentityMap | None'] = ContextVar('sso_identity_map', default=None)
+
+
+class SSOIdentityMap:
+    """
+    Request scoped map of resolved SSO objects : within one scope every key (e.g. a
+    user id) is resolved and deserialized once and the same object is returned to
+    every later caller. Hit / miss counts are kept for debugging.
+    """
+
+    def __init__(self):
+        self._objects: dict[Hashable, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._objects
+
+    def get_or_resolve(self, key: Hashable, resolve: Callable[[], Any]) -> Any:
+        """
+        Return the object stored under ``key``, calling ``resolve`` to build it on the first access.
+        """
+        try:
+            value = self._objects[key]
+        except KeyError:
+            self.misses += 1
+            value = self._objects[key] = resolve()
+            return value
+        self.hits += 1
+        return value
+
+    def clear(self) -> None:
+        """
+        Drop the stored objects, the hit / miss counts are kept.
+        """
+        self._objects.clear()
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self._objects),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+def get_identity_map() -> SSOIdentityMap | None:
+    """
+    Identity map of the current scope, None outside of one (nothing is shared then).
+    """
+    return _current_identity_map.get()
+
+
+def resolve_identity(key: Hashable, resolve: Callable[[], Any]) -> Any:
+    """
+    ``resolve()`` through the current identity map, or directly when no scope is active.
+    """
+    identity_map = _current_identity_map.get()
+    if identity_map is None:
+        return resolve()
+    return identity_map.get_or_resolve(key, resolve)
+
+
+@contextmanager
+def identity_map_scope() -> Iterator[SSOIdentityMap]:
+    """
+    Activate a fresh identity map for the enclosed code (one request, task, ...).
+    """
+    identity_map = SSOIdentityMap()
+    token = _current_identity_map.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _current_identity_map.reset(token)
+        logger.debug(f"SSO identity map released : {identity_map.stats()}")
+        identity_map.clear()
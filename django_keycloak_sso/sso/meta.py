@@ -3,6 +3,7 @@ from rest_framework import serializers
 
 from django_keycloak_sso.sso import fields as sso_fields
 from django_keycloak_sso.sso.fields import SSOUserField, SSOGroupField
+from django_keycloak_sso.sso.prefetch import SSO_PREFETCH_CACHE_ATTR
 from .sso import SSOKlass
 
 
@@ -44,6 +45,10 @@ class SSOModelMeta(models.base.ModelBase):
             field = instance._meta.get_field(field_name)
             if hasattr(value, "id"):
                 value = getattr(value, "id")
+            # Use the data attached by prefetch_sso while the field still holds the same id
+            prefetched = instance.__dict__.get(SSO_PREFETCH_CACHE_ATTR, {}).get(field_name)
+            if prefetched and prefetched[0] == str(value):
+                return prefetched[1]
             # Use the field's `get_full_data` method to fetch detailed data
             return field.get_full_data(value=value)
 
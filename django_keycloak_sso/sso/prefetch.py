@@ -0,0 +1,128 @@
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+
+from django_keycloak_sso.sso.authentication import CustomUser, CustomGroup
+from django_keycloak_sso.sso.fields import CustomSSORelatedField
+from django_keycloak_sso.sso.sso import SSOKlass
+
+# Instance attribute holding the prefetched ``<field>_data`` objects, as field name -> (id, object)
+SSO_PREFETCH_CACHE_ATTR = '_sso_prefetched_cache'
+
+sso_klass = SSOKlass()
+
+
+def _get_sso_fields(model: type[models.Model], field_names: tuple[str, ...]) -> list[CustomSSORelatedField]:
+    if not field_names:
+        return [field for field in model._meta.fields if isinstance(field, CustomSSORelatedField)]
+    sso_fields = []
+    for field_name in field_names:
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            raise ValueError(f"'{field_name}' is not a field of {model.__name__}")
+        if not isinstance(field, CustomSSORelatedField) or field.sso_field_type is None:
+            raise ValueError(f"'{field_name}' is not an SSO user or group field of {model.__name__}")
+        sso_fields.append(field)
+    return sso_fields
+
+
+def _get_field_id(instance: models.Model, field: CustomSSORelatedField) -> str | None:
+    value = getattr(instance, field.attname)
+    if hasattr(value, "id"):
+        value = value.id
+    return str(value) if value not in (None, '') else None
+
+
+def prefetch_sso(instances: Iterable[models.Model], *field_names: str) -> list[models.Model]:
+    """
+    ``prefetch_related`` for SSO fields : collect the ids referenced by ``field_names``
+    (every SSOUserField / SSOGroupField when empty) across ``instances``, resolve them
+    with one ``get_users_by_ids`` / ``get_groups_by_ids`` call per type and attach the
+    results, so reading ``instance.<field>_data`` afterward does no cache or Keycloak I/O.
+    Ids that could not be resolved are attached as empty objects, like the property returns them.
+    """
+    instances = [instance for instance in instances if isinstance(instance, models.Model)]
+    if not instances:
+        return instances
+
+    resolvers = {
+        SSOKlass.SSOFieldTypeChoices.USER: (sso_klass.get_users_by_ids, CustomUser),
+        SSOKlass.SSOFieldTypeChoices.GROUP: (sso_klass.get_groups_by_ids, CustomGroup),
+    }
+    fields_by_type: dict[str, list[CustomSSORelatedField]] = {}
+    for field in _get_sso_fields(type(instances[0]), field_names):
+        if field.sso_field_type in resolvers:
+            fields_by_type.setdefault(field.sso_field_type, []).append(field)
+
+    for field_type, fields in fields_by_type.items():
+        get_objects_by_ids, getter_klass = resolvers[field_type]
+        ids = [_get_field_id(instance, field) for instance in instances for field in fields]
+        data, errors = get_objects_by_ids([pk for pk in ids if pk])
+        for instance in instances:
+            prefetched_cache = instance.__dict__.setdefault(SSO_PREFETCH_CACHE_ATTR, {})
+            for field in fields:
+                pk = _get_field_id(instance, field)
+                if pk:
+                    prefetched_cache[field.name] = (pk, getter_klass(payload=data.get(pk)))
+    return instances
+
+
+class SSOQuerySet(models.QuerySet):
+    """
+    QuerySet adding ``prefetch_sso(*field_names)``, applied once when the queryset is evaluated.
+    ``iterator()`` does not fill the result cache, it prefetches each chunk of rows instead.
+    """
+    # Rows per prefetch_sso call of iterator() when no chunk_size is given
+    sso_prefetch_chunk_size = 2000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # None : no SSO prefetch, () : every SSO field
+        self._sso_prefetch_lookups: tuple[str, ...] | None = None
+        self._sso_prefetch_done = False
+
+    def prefetch_sso(self, *field_names: str) -> 'SSOQuerySet':
+        """
+        Return a new QuerySet resolving the given SSO fields (all of them when empty) in bulk.
+        Use ``prefetch_sso(None)`` to clear the lookups.
+        """
+        clone = self._chain()
+        if field_names == (None,):
+            clone._sso_prefetch_lookups = None
+        elif not field_names or clone._sso_prefetch_lookups == ():
+            clone._sso_prefetch_lookups = ()
+        else:
+            clone._sso_prefetch_lookups = tuple(dict.fromkeys((clone._sso_prefetch_lookups or ()) + field_names))
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._sso_prefetch_lookups = self._sso_prefetch_lookups
+        return clone
+
+    def _fetch_all(self):
+        super()._fetch_all()
+        if self._sso_prefetch_lookups is not None and not self._sso_prefetch_done:
+            prefetch_sso(self._result_cache, *self._sso_prefetch_lookups)
+            self._sso_prefetch_done = True
+
+    def iterator(self, *args, **kwargs):
+        rows = super().iterator(*args, **kwargs)
+        if self._sso_prefetch_lookups is None:
+            return rows
+        chunk_size = kwargs.get('chunk_size', args[0] if args else None) or self.sso_prefetch_chunk_size
+        return self._sso_prefetch_chunks(rows, chunk_size)
+
+    def _sso_prefetch_chunks(self, rows: Iterator, chunk_size: int) -> Iterator:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            prefetch_sso(chunk, *self._sso_prefetch_lookups)
+            yield from chunk
+
+
+SSOManager = models.Manager.from_queryset(SSOQuerySet, 'SSOManager')
@@ -1,18 +1,22 @@
+import copy
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
 from typing import Type, Optional
 from urllib.parse import urlencode
+from uuid import UUID
 
-import requests
 from django.db.models import TextChoices, Model, QuerySet
 from django.utils.translation import gettext_lazy as _
 from requests.exceptions import HTTPError
 
 from django_keycloak_sso.api.serializers import GroupSerializer, UserSerializer
-from django_keycloak_sso.caching import SSOCacheControlKlass
+from django_keycloak_sso.caching import SSOCacheControlKlass, SSODataList
 from django_keycloak_sso.helpers import get_settings_value
+from django_keycloak_sso.http_client import get_http_session, get_request_timeout
 from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
 from django_keycloak_sso.sso.authentication import CustomUser, CustomGroup
+from django_keycloak_sso.sso.identity_map import get_identity_map, resolve_identity
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +58,9 @@ class SSOKlass:
     def __init__(self):
         self.sso_url = get_settings_value('SSO_SERVICE_BASE_URL')
         self.sso_admin_url = f"{self.sso_url}/admin-panel/v1"
+        self.bulk_fetch_max_workers = get_settings_value('KEYCLOAK_BULK_FETCH_MAX_WORKERS', 8)
+        self.stale_cache_timeout = get_settings_value('KEYCLOAK_STALE_CACHE_TIMEOUT', 86400)
+        self.stale_list_refresh_interval = get_settings_value('KEYCLOAK_STALE_LIST_REFRESH_INTERVAL', 300)
         self.keycloak_klass = KeyCloakConfidentialClient()
         self.sso_cache_klass = SSOCacheControlKlass()
 
@@ -99,7 +106,7 @@ class SSOKlass:
         else:
             url = f"{self.sso_url}/{endpoint}"
         try:
-            response = requests.get(url, headers=self._get_headers())
+            response = get_http_session().get(url, headers=self._get_headers(), timeout=get_request_timeout())
             response.raise_for_status()
             return response.json()
         # TODO : fix this dumb handler
@@ -115,6 +122,38 @@ class SSOKlass:
             # return None
             raise self.SSOKlassException(err)
 
+    def _get_with_stale_fallback(
+            self,
+            stale_key: str,
+            fetch,
+            *args,
+            store_stale: bool = True,
+            stale_refresh_interval: int = 0,
+            **kwargs
+    ):
+        """
+        Call ``fetch`` and remember its result as the last known value of ``stale_key``
+        (unless ``store_stale`` is False, the bulk path stores them all at once).
+        If Keycloak is failing (or the circuit breaker is open) the last known value is
+        returned instead, missing objects (404) are never served from it.
+        """
+        try:
+            data = fetch(*args, **kwargs)
+        except KeyCloakConfidentialClient.KeyCloakException as e:
+            stale_data = self.sso_cache_klass.get_stale_value(stale_key)
+            if stale_data is None:
+                raise
+            logger.warning(f"Serving stale SSO data for {stale_key} : {e}")
+            return stale_data
+        if data and store_stale:
+            self.sso_cache_klass.set_stale_value(
+                stale_key,
+                data,
+                timeout=self.stale_cache_timeout,
+                refresh_interval=stale_refresh_interval
+            )
+        return data
+
     def get_sso_data(self, data_type: SSODataTypeChoices, data_form: SSODataFormChoices, *args, **kwargs):
         self.validate_enums_value(data_type, self.SSODataTypeChoices)
         self.validate_enums_value(data_form, self.SSODataFormChoices)
@@ -149,16 +188,19 @@ class SSOKlass:
         except self.sso_request_exceptions as e:
             return False
 
-    def get_user_detail_data(self, pk, *args, **kwargs):
+    def get_user_detail_data(self, pk, *args, store_stale: bool = True, **kwargs):
         """Public method to get user data from SSO based on user ID."""
         # endpoint = f"accounts/users/{pk}"
         # user_data = self._get_request_data(endpoint, is_admin_panel=True)
-        user_data = self.keycloak_klass.send_request(
+        user_data = self._get_with_stale_fallback(
+            f"{self.SSOFieldTypeChoices.USER}_{pk}",
+            self.keycloak_klass.send_request,
             self.keycloak_klass.KeyCloakRequestTypeChoices.USERS,
             self.keycloak_klass.KeyCloakRequestTypeChoices,
             self.keycloak_klass.KeyCloakRequestMethodChoices.GET,
             self.keycloak_klass.KeyCloakPanelTypeChoices.ADMIN,
             detail_pk=pk,
+            store_stale=store_stale,
         )
         if user_data:
             return user_data
@@ -169,11 +211,14 @@ class SSOKlass:
         """Public method to search users on the SSO server."""
         # endpoint = "accounts/users/"
         # users_data = self._get_request_data(endpoint, is_admin_panel=True)
-        users_data = self.keycloak_klass.send_request(
+        users_data = self._get_with_stale_fallback(
+            f"{self.SSOFieldTypeChoices.USER.lower()}s",
+            self.keycloak_klass.send_request,
             self.keycloak_klass.KeyCloakRequestTypeChoices.USERS,
             self.keycloak_klass.KeyCloakRequestTypeChoices,
             self.keycloak_klass.KeyCloakRequestMethodChoices.GET,
             self.keycloak_klass.KeyCloakPanelTypeChoices.ADMIN,
+            stale_refresh_interval=self.stale_list_refresh_interval,
         )
         if users_data:
             return users_data
@@ -199,32 +244,101 @@ class SSOKlass:
         """Public method to search users on the SSO server."""
         # endpoint = self._build_filter_url(base_url=endpoint, **kwargs)
         # data = self._get_request_data(endpoint, is_admin_panel=True)
-        data = self.keycloak_klass.send_request(
+        data = self._get_with_stale_fallback(
+            f"{self.SSOFieldTypeChoices.GROUP.lower()}s",
+            self.keycloak_klass.send_request,
             self.keycloak_klass.KeyCloakRequestTypeChoices.GROUPS,
             self.keycloak_klass.KeyCloakRequestTypeChoices,
             self.keycloak_klass.KeyCloakRequestMethodChoices.GET,
             self.keycloak_klass.KeyCloakPanelTypeChoices.ADMIN,
+            stale_refresh_interval=self.stale_list_refresh_interval,
         )
         if data:
             return data
         raise self.SSOKlassException(_("Failed to retrieve company groups list data"))
 
-    def get_company_group_detail_data(self, pk, *args, **kwargs):
+    def get_company_group_detail_data(self, pk, *args, store_stale: bool = True, **kwargs):
         """Public method to search users on the SSO server."""
         # endpoint = f"accounts/groups/{pk}/"
         # data = self._get_request_data(endpoint, is_admin_panel=True)
-        data = self.keycloak_klass.send_request(
+        data = self._get_with_stale_fallback(
+            f"{self.SSOFieldTypeChoices.GROUP}_{pk}",
+            self.keycloak_klass.send_request,
             self.keycloak_klass.KeyCloakRequestTypeChoices.GROUPS,
             self.keycloak_klass.KeyCloakRequestTypeChoices,
             self.keycloak_klass.KeyCloakRequestMethodChoices.GET,
             self.keycloak_klass.KeyCloakPanelTypeChoices.ADMIN,
-            detail_pk=pk
-
+            detail_pk=pk,
+            store_stale=store_stale,
         )
         if data:
             return data
         raise self.SSOKlassException(_("Failed to retrieve company groups detail data"))
 
+    def _get_objects_by_ids(
+            self,
+            ids: list,
+            field_type: SSOFieldTypeChoices,
+            detail_method,
+            max_workers: int = None,
+    ) -> tuple[dict, dict]:
+        """
+        Resolve many objects at once: ids are deduplicated, served from the per-id cache
+        with one ``get_many`` and the rest is fetched concurrently with a bounded worker
+        pool, then cached (and kept as last known values) with one ``set_many`` each.
+
+        Returns ``(data, errors)`` where ``data`` maps id -> payload and ``errors``
+        maps every id that could not be fetched to its exception.
+        """
+        errors = {}
+        # An empty id would turn the detail request into a request for the whole list
+        ids = list(dict.fromkeys(str(pk) for pk in ids if pk is not None and str(pk) != ''))
+        data = self.sso_cache_klass.get_many(field_type, ids)
+        missing_ids = [pk for pk in ids if pk not in data]
+
+        if not missing_ids:
+            return data, errors
+
+        fetched_data = {}
+        if len(missing_ids) == 1:
+            # A single id (e.g. a model field) is fetched inline, a worker pool would only add overhead
+            pk = missing_ids[0]
+            try:
+                fetched_data[pk] = detail_method(pk, store_stale=False)
+            except self.sso_request_exceptions as e:
+                errors[pk] = e
+        else:
+            max_workers = min(max_workers or self.bulk_fetch_max_workers, len(missing_ids))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sso-bulk-fetch') as executor:
+                # Stale copies are written below in one batch, not one cache call per worker
+                futures = {executor.submit(detail_method, pk, store_stale=False): pk for pk in missing_ids}
+                for future in as_completed(futures):
+                    pk = futures[future]
+                    try:
+                        fetched_data[pk] = future.result()
+                    except self.sso_request_exceptions as e:
+                        errors[pk] = e
+        self.sso_cache_klass.set_many(field_type, fetched_data, timeout=timedelta(hours=1).seconds)
+        self.sso_cache_klass.set_many_stale_values(
+            {self.sso_cache_klass.get_cache_key(field_type, pk): payload for pk, payload in fetched_data.items() if payload},
+            timeout=self.stale_cache_timeout
+        )
+        data.update(fetched_data)
+        return data, errors
+
+    def get_users_by_ids(self, ids: list, max_workers: int = None) -> tuple[dict, dict]:
+        """Public method to get many users data from SSO, see ``_get_objects_by_ids``."""
+        return self._get_objects_by_ids(ids, self.SSOFieldTypeChoices.USER, self.get_user_detail_data, max_workers)
+
+    def get_groups_by_ids(self, ids: list, max_workers: int = None) -> tuple[dict, dict]:
+        """Public method to get many groups data from SSO, see ``_get_objects_by_ids``."""
+        return self._get_objects_by_ids(
+            ids,
+            self.SSOFieldTypeChoices.GROUP,
+            self.get_company_group_detail_data,
+            max_workers
+        )
+
     # TODO : modify this for works with keycloak
     @staticmethod
     def has_user_role_in_group(user_groups: list[dict], group_id: int, user_role: CompanyGroupRoleChoices):
@@ -247,36 +361,68 @@ class SSOKlass:
     # TODO : modify this for works with keycloak
     @classmethod
     def get_obj_by_id(cls, data_list, obj_id):
-        for data_ in data_list:
-            if data_.get('id') == obj_id:
+        if isinstance(data_list, SSODataList):
+            data_ = data_list.get_by_id(obj_id)
+            if data_ is not None:
                 return data_
+        else:
+            for data_ in data_list:
+                if data_.get('id') == obj_id:
+                    return data_
         raise cls.SSOKlassNotFoundException(f"Group with ID {obj_id} not found.")
 
-    def get_sso_data_list(self, queryset: QuerySet | list, field_name: str, field_type: SSOFieldTypeChoices) -> list:
-        list_data = self.sso_cache_klass.get_cached_value(field_type=field_type)
-        if not list_data:
-            list_data = list()
-            if queryset and (isinstance(queryset, QuerySet) or isinstance(queryset, list)):
-                # list_ids = queryset.values_list(field_name, flat=True)
-                list_ids = []
-                if field_type == self.SSOFieldTypeChoices.GROUP:
-                    data_type = SSOKlass.SSODataTypeChoices.COMPANY_GROUP
-                elif field_type == self.SSOFieldTypeChoices.USER:
-                    data_type = SSOKlass.SSODataTypeChoices.USER
-                else:
-                    raise ValueError("field_type is not valid")
-                list_data = self.get_sso_data(
-                    data_type=data_type,
-                    data_form=SSOKlass.SSODataFormChoices.LIST,
-                    ids_filtering_list=list_ids,
-                )
-                self.sso_cache_klass.set_cache_value(
-                    field_type=field_type,
-                    value=list_data,
-                    timeout=timedelta(hours=1).seconds
-                )
-
-        return list_data
+    @staticmethod
+    def _extract_sso_ids(queryset: QuerySet | list, field_name: str) -> list:
+        """
+        Distinct non null ids of ``field_name`` from a queryset, a list of model
+        instances or a plain list of ids, in their first seen order.
+        """
+        if isinstance(queryset, QuerySet):
+            # Only load the id column, a prefetch of the queryset is not triggered either
+            values = queryset.values_list(field_name, flat=True)
+        else:
+            values = (
+                item if isinstance(item, (str, int, UUID)) else getattr(item, field_name, None)
+                for item in queryset
+            )
+        return list(dict.fromkeys(str(value) for value in values if value is not None and value != ''))
+
+    def get_sso_data_list(
+            self,
+            queryset: QuerySet | list,
+            field_name: str,
+            field_type: SSOFieldTypeChoices,
+            max_workers: int = None
+    ) -> SSODataList:
+        """
+        Resolve the SSO objects referenced by ``field_name`` in ``queryset``. Only those
+        ids are looked up : per-id cache hits are reused and the rest is fetched with
+        ``get_users_by_ids`` / ``get_groups_by_ids``, so the cost follows the page size
+        instead of the realm size. Ids that could not be fetched are left out and listed
+        in ``failed_ids``, ``get_serializer_field_data`` does not request them again.
+        """
+        if field_type == self.SSOFieldTypeChoices.GROUP:
+            get_objects_by_ids = self.get_groups_by_ids
+        elif field_type == self.SSOFieldTypeChoices.USER:
+            get_objects_by_ids = self.get_users_by_ids
+        else:
+            raise ValueError("field_type is not valid")
+        if not isinstance(queryset, (QuerySet, list, tuple, set)):
+            return SSODataList()
+
+        list_ids = self._extract_sso_ids(queryset, field_name)
+        if not list_ids:
+            return SSODataList()
+        data, errors = get_objects_by_ids(list_ids, max_workers=max_workers)
+        if errors:
+            logger.warning(f"Failed to retrieve {len(errors)} {field_type.lower()}(s) from SSO : {list(errors)}")
+        return SSODataList(
+            (
+                payload[0] if isinstance(payload, list) and payload else payload
+                for payload in (data[pk] for pk in list_ids if pk in data)
+            ),
+            failed_ids=errors,
+        )
 
     def get_serializer_field_data(
             self,
@@ -285,6 +431,24 @@ class SSOKlass:
             obj_: Model,
             list_data: Optional[list] = None,
             get_from_list: bool = False
+    ) -> dict | None:
+        obj_id = getattr(obj_, field_name)
+        if not obj_id:
+            return self._resolve_serializer_field_data(field_name, field_type, obj_, list_data, get_from_list)
+        # Same id in the same request : resolved and serialized once, every caller gets its own copy
+        data = resolve_identity(
+            ('serializer_field_data', str(field_type), str(obj_id), bool(get_from_list)),
+            lambda: self._resolve_serializer_field_data(field_name, field_type, obj_, list_data, get_from_list),
+        )
+        return copy.deepcopy(data) if get_identity_map() is not None else data
+
+    def _resolve_serializer_field_data(
+            self,
+            field_name: str,
+            field_type: SSOFieldTypeChoices,
+            obj_: Model,
+            list_data: Optional[list] = None,
+            get_from_list: bool = False
     ) -> dict | None:
         has_error = False
         data = None
@@ -292,6 +456,9 @@ class SSOKlass:
             try:
                 data = self.get_obj_by_id(list_data, getattr(obj_, field_name))
             except SSOKlass.SSOKlassNotFoundException as e:
+                if str(getattr(obj_, field_name)) in getattr(list_data, 'failed_ids', ()):
+                    # Already failed while the list was fetched, don't request it once per row
+                    return None
                 has_error = True
         if not get_from_list or (get_from_list and has_error):
             try:
@@ -0,0 +1 @@
+from .fake_keycloak import FakeKeycloakServer, FakeRealm, FaultInjection, generate_signing_key
@@ -0,0 +1,743 @@
+"""
+In-process stand-in for the Keycloak endpoints used by this package.
+
+It serves the OpenID Connect endpoints (token grants, certs, introspect, userinfo,
+logout) and the admin REST endpoints (users, groups, memberships, role mappings,
+client roles) of a single realm filled with seeded data, signs tokens with its own
+RSA keys and can inject latency and failures, so caching, retries, the circuit
+breaker and concurrency can be exercised without a live Keycloak.
+
+    with FakeKeycloakServer(realm='main', client_id='back', client_secret='secret') as server:
+        settings.KEYCLOAK_SERVER_URL = server.url
+        ...
+
+or standalone :
+
+    python -m django_keycloak_sso.testing.fake_keycloak --port 8089 --realm main --users 200
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+from jose import jwk, jwt
+from jose.exceptions import JWTError
+
+GROUP_ROLE_SUBGROUPS = ('managers', 'assistants', 'employees')
+
+
+def generate_signing_key(kid: str) -> tuple[bytes, dict]:
+    """
+    Return a fresh RSA private key (PEM) and the public JWK published for it.
+    """
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa as crypto_rsa
+    except ImportError:
+        import rsa
+        _, private_key = rsa.newkeys(2048)
+        private_pem = private_key.save_pkcs1()
+    else:
+        private_key = crypto_rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    public_jwk = jwk.construct(private_pem, 'RS256').public_key().to_dict()
+    public_jwk.update({'kid': kid, 'use': 'sig', 'alg': 'RS256'})
+    return private_pem, public_jwk
+
+
+class FaultInjection:
+    """
+    Latency and failures applied to the requests whose path contains ``path_contains``
+    (every request when it is None).
+    """
+
+    def __init__(self):
+        self.latency = 0.0
+        self.latency_jitter = 0.0
+        self.failure_rate = 0.0
+        self.failure_status = 503
+        self.path_contains: str | None = None
+        self._fail_next: list[int] = []
+        self._lock = threading.Lock()
+
+    def configure(
+            self,
+            *,
+            latency: float = 0.0,
+            latency_jitter: float = 0.0,
+            failure_rate: float = 0.0,
+            failure_status: int = 503,
+            path_contains: str | None = None,
+    ) -> None:
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.path_contains = path_contains
+
+    def fail_next(self, count: int = 1, status: int = 503) -> None:
+        """
+        Make the next ``count`` matching requests answer ``status``.
+        """
+        with self._lock:
+            self._fail_next.extend([status] * count)
+
+    def reset(self) -> None:
+        self.configure()
+        with self._lock:
+            self._fail_next.clear()
+
+    def apply(self, path: str) -> int | None:
+        """
+        Sleep for the configured latency and return the status to fail with, if any.
+        """
+        if self.path_contains and self.path_contains not in path:
+            return None
+        delay = self.latency + random.uniform(0, self.latency_jitter) if self.latency_jitter else self.latency
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            if self._fail_next:
+                return self._fail_next.pop(0)
+        if self.failure_rate and random.random() < self.failure_rate:
+            return self.failure_status
+        return None
+
+
+class FakeRealm:
+    """
+    Realm data served by FakeKeycloakServer: users, two level company groups
+    (``/<company>/<managers|assistants|employees>``), memberships and roles.
+    """
+
+    def __init__(self, name: str, client_id: str, client_pk: str):
+        self.name = name
+        self.client_id = client_id
+        self.client_pk = client_pk
+        self.users: dict[str, dict] = {}
+        self.passwords: dict[str, str] = {}
+        self.groups: dict[str, dict] = {}
+        self.user_groups: dict[str, list[str]] = {}
+        self.realm_roles: dict[str, dict] = {}
+        self.client_roles: dict[str, dict] = {}
+        self.user_realm_roles: dict[str, list[str]] = {}
+        self.user_client_roles: dict[str, list[str]] = {}
+        self.group_client_roles: dict[str, list[str]] = {}
+        self.lock = threading.RLock()
+        for role_name in ('offline_access', 'uma_authorization', f'default-roles-{name}'):
+            self.add_realm_role(role_name)
+
+    @staticmethod
+    def _new_id(prefix: str, seed: int | str | None) -> str:
+        if seed is None:
+            return str(uuid.uuid4())
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f'{prefix}-{seed}'))
+
+    def add_realm_role(self, name: str) -> dict:
+        role = {'id': self._new_id('realm-role', name), 'name': name, 'composite': False, 'clientRole': False}
+        self.realm_roles[role['id']] = role
+        return role
+
+    def add_client_role(self, name: str) -> dict:
+        role = {
+            'id': self._new_id('client-role', name),
+            'name': name,
+            'composite': False,
+            'clientRole': True,
+            'containerId': self.client_pk,
+        }
+        self.client_roles[role['id']] = role
+        return role
+
+    def add_group(self, name: str, parent_id: str | None = None, seed: int | None = None) -> dict:
+        with self.lock:
+            parent = self.groups.get(parent_id) if parent_id else None
+            group = {
+                'id': self._new_id(f'group-{parent_id}-{name}', seed),
+                'name': name,
+                'path': f"{parent['path'] if parent else ''}/{name}",
+                'subGroupCount': 0,
+                'subGroups': [],
+                'attributes': {},
+            }
+            if parent:
+                group['parentId'] = parent['id']
+                parent['subGroups'].append(group)
+                parent['subGroupCount'] += 1
+            self.groups[group['id']] = group
+            return group
+
+    def delete_group(self, group_id: str) -> bool:
+        with self.lock:
+            group = self.groups.pop(group_id, None)
+            if group is None:
+                return False
+            for sub_group in list(group['subGroups']):
+                self.delete_group(sub_group['id'])
+            parent = self.groups.get(group.get('parentId'))
+            if parent:
+                parent['subGroups'] = [g for g in parent['subGroups'] if g['id'] != group_id]
+                parent['subGroupCount'] = len(parent['subGroups'])
+            for group_ids in self.user_groups.values():
+                if group_id in group_ids:
+                    group_ids.remove(group_id)
+            return True
+
+    def add_user(self, username: str, password: str = 'password', seed: int | None = None, **fields) -> dict:
+        with self.lock:
+            user = {
+                'id': self._new_id(f'user-{username}', seed),
+                'username': username,
+                'firstName': fields.pop('firstName', username.capitalize()),
+                'lastName': fields.pop('lastName', 'Fake'),
+                'email': fields.pop('email', f'{username}@example.com'),
+                'emailVerified': True,
+                'enabled': True,
+                'createdTimestamp': int(time.time() * 1000),
+                'attributes': {},
+            }
+            user.update(fields)
+            self.users[user['id']] = user
+            self.passwords[username] = password
+            self.user_groups.setdefault(user['id'], [])
+            self.user_realm_roles[user['id']] = [
+                role['id'] for role in self.realm_roles.values() if role['name'].startswith('default-roles-')
+            ]
+            self.user_client_roles.setdefault(user['id'], [])
+            return user
+
+    def join_group(self, user_id: str, group_id: str) -> None:
+        with self.lock:
+            group_ids = self.user_groups.setdefault(user_id, [])
+            if group_id not in group_ids:
+                group_ids.append(group_id)
+
+    def get_user_by_username(self, username: str) -> dict | None:
+        for user in self.users.values():
+            if user['username'] == username:
+                return user
+        return None
+
+    def seed(self, users: int = 20, groups: int = 3, client_roles: tuple[str, ...] = ('admin', 'viewer')) -> None:
+        """
+        Deterministically fill the realm : ``groups`` companies with a managers /
+        assistants / employees sub group each and ``users`` users spread over them.
+        """
+        for role_name in client_roles:
+            self.add_client_role(role_name)
+        companies = []
+        for index in range(groups):
+            company = self.add_group(f'company{index}', seed=index)
+            companies.append([
+                self.add_group(sub_group, parent_id=company['id'], seed=index) for sub_group in GROUP_ROLE_SUBGROUPS
+            ])
+        client_role_ids = list(self.client_roles)
+        for index in range(users):
+            user = self.add_user(f'user{index}', seed=index)
+            if companies:
+                role_groups = companies[index % len(companies)]
+                # One manager per company, then assistants and employees
+                role_group = role_groups[0] if index < len(companies) else role_groups[1 + index % 2]
+                self.join_group(user['id'], role_group['id'])
+            if client_role_ids:
+                self.user_client_roles[user['id']].append(client_role_ids[index % len(client_role_ids)])
+
+    def get_user_groups(self, user_id: str) -> list[dict]:
+        return [self.groups[group_id] for group_id in self.user_groups.get(user_id, []) if group_id in self.groups]
+
+    def get_role_mappings(self, user_id: str) -> dict:
+        client_roles = [self.client_roles[r] for r in self.user_client_roles.get(user_id, []) if r in self.client_roles]
+        mappings = {'realmMappings': [self.realm_roles[r] for r in self.user_realm_roles.get(user_id, [])]}
+        if client_roles:
+            mappings['clientMappings'] = {
+                self.client_id: {'id': self.client_pk, 'client': self.client_id, 'mappings': client_roles}
+            }
+        return mappings
+
+    def get_token_claims(self, user: dict) -> dict:
+        return {
+            'sub': user['id'],
+            'preferred_username': user['username'],
+            'email': user['email'],
+            'email_verified': user['emailVerified'],
+            'given_name': user['firstName'],
+            'family_name': user['lastName'],
+            'name': f"{user['firstName']} {user['lastName']}",
+            'groups': [group['path'] for group in self.get_user_groups(user['id'])],
+            'realm_access': {
+                'roles': [self.realm_roles[r]['name'] for r in self.user_realm_roles.get(user['id'], [])]
+            },
+            'resource_access': {
+                self.client_id: {
+                    'roles': [self.client_roles[r]['name'] for r in self.user_client_roles.get(user['id'], [])]
+                }
+            },
+        }
+
+
+def _page(items: list, query: dict) -> list:
+    first = int(query.get('first', 0))
+    max_results = query.get('max')
+    if max_results is None:
+        return items[first:]
+    return items[first:first + int(max_results)]
+
+
+class _FakeKeycloakRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'FakeKeycloak/1.0'
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, keep-alive clients would otherwise hit delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.fake.verbose:
+            super().log_message(format, *args)
+
+    def _handle(self) -> None:
+        self.server.fake.dispatch(self)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def send_json(self, status: int, data: Any = None) -> None:
+        body = json.dumps(data).encode() if data is not None else b''
+        self.send_response(status)
+        if body:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+class FakeKeycloakServer:
+    """
+    Threaded HTTP server answering like a Keycloak realm. ``request_counts`` counts
+    handled requests per ``(method, route name)`` (e.g. ``('GET', 'users')``) to assert
+    on caching behaviour, and ``faults`` injects latency and errors.
+    """
+
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            realm: str = 'main',
+            client_id: str = 'back',
+            client_secret: str = 'secret',
+            client_pk: str = 'fake-client-pk',
+            issuer_prefix: str | None = None,
+            token_lifetime: int = 300,
+            seed_users: int = 20,
+            seed_groups: int = 3,
+            verbose: bool = False,
+    ):
+        self.realm = FakeRealm(realm, client_id, client_pk)
+        self.realm.seed(users=seed_users, groups=seed_groups)
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_lifetime = token_lifetime
+        self.verbose = verbose
+        self.faults = FaultInjection()
+        self.request_counts: dict[tuple[str, str], int] = {}
+        self.revoked_tokens: set[str] = set()
+        self._issuer_prefix = issuer_prefix
+        self._signing_keys: list[tuple[str, bytes, dict]] = []
+        self._counts_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.rotate_signing_key()
+        self.httpd = ThreadingHTTPServer((host, port), _FakeKeycloakRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self._routes: list[tuple[str, str, re.Pattern, Callable]] = []
+        self._register_routes()
+
+    # --- lifecycle ---
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def issuer(self) -> str:
+        return f'{self._issuer_prefix or self.url}/realms/{self.realm.name}'
+
+    def start(self) -> 'FakeKeycloakServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-keycloak', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'FakeKeycloakServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset_counts(self) -> None:
+        with self._counts_lock:
+            self.request_counts.clear()
+
+    def count(self, route: str, method: str = 'GET') -> int:
+        return self.request_counts.get((method, route), 0)
+
+    # --- tokens ---
+
+    @property
+    def jwks(self) -> dict:
+        return {'keys': [public_jwk for _, _, public_jwk in self._signing_keys]}
+
+    def rotate_signing_key(self, keep_previous: bool = True) -> str:
+        """
+        Sign new tokens with a fresh key. The previous keys stay published unless
+        ``keep_previous`` is False. Returns the new ``kid``.
+        """
+        kid = uuid.uuid4().hex
+        private_pem, public_jwk = generate_signing_key(kid)
+        if not keep_previous:
+            self._signing_keys.clear()
+        self._signing_keys.insert(0, (kid, private_pem, public_jwk))
+        return kid
+
+    def sign(self, claims: dict) -> str:
+        kid, private_pem, _ = self._signing_keys[0]
+        return jwt.encode(claims, private_pem, algorithm='RS256', headers={'kid': kid})
+
+    def _decode(self, token: str) -> dict | None:
+        if not token or token in self.revoked_tokens:
+            return None
+        try:
+            return jwt.decode(token, self.jwks, algorithms=['RS256'], options={'verify_aud': False})
+        except JWTError:
+            return None
+
+    def issue_tokens(self, user: dict | None = None, lifetime: int | None = None, **extra_claims) -> dict:
+        """
+        Token endpoint response for ``user`` (the service account when None).
+        """
+        now = int(time.time())
+        lifetime = lifetime or self.token_lifetime
+        if user is None:
+            claims = {'sub': f'service-account-{self.client_id}', 'preferred_username': f'service-account-{self.client_id}'}
+        else:
+            claims = self.realm.get_token_claims(user)
+        claims.update({
+            'iss': self.issuer,
+            'aud': 'account',
+            'azp': self.client_id,
+            'typ': 'Bearer',
+            'iat': now,
+            'exp': now + lifetime,
+            'jti': uuid.uuid4().hex,
+        })
+        claims.update(extra_claims)
+        response = {
+            'access_token': self.sign(claims),
+            'expires_in': lifetime,
+            'token_type': 'Bearer',
+            'scope': 'profile email',
+        }
+        if user is not None:
+            response.update({
+                'refresh_token': self.sign({**claims, 'typ': 'Refresh', 'exp': now + lifetime * 6, 'jti': uuid.uuid4().hex}),
+                'refresh_expires_in': lifetime * 6,
+            })
+        return response
+
+    def issue_user_token(self, username: str, **extra_claims) -> str:
+        return self.issue_tokens(self.realm.get_user_by_username(username), **extra_claims)['access_token']
+
+    # --- routing ---
+
+    def _register_routes(self) -> None:
+        oidc = rf'/realms/{re.escape(self.realm.name)}/protocol/openid-connect'
+        admin = rf'/admin/realms/{re.escape(self.realm.name)}'
+        client_pk = re.escape(self.realm.client_pk)
+        routes = [
+            ('POST', 'token', rf'{oidc}/token', self._token),
+            ('GET', 'certs', rf'{oidc}/certs', self._certs),
+            ('POST', 'introspect', rf'{oidc}/token/introspect', self._introspect),
+            ('GET', 'userinfo', rf'{oidc}/userinfo', self._userinfo),
+            ('POST', 'logout', rf'{oidc}/logout', self._logout),
+            ('GET', 'users', rf'{admin}/users', self._users),
+            ('GET', 'user_detail', rf'{admin}/users/(?P<user_id>[^/]+)', self._user_detail),
+            ('GET', 'user_groups', rf'{admin}/users/(?P<user_id>[^/]+)/groups', self._user_groups),
+            ('PUT', 'user_join_group', rf'{admin}/users/(?P<user_id>[^/]+)/groups/(?P<group_id>[^/]+)',
+             self._user_join_group),
+            ('GET', 'user_role_mappings', rf'{admin}/users/(?P<user_id>[^/]+)/role-mappings', self._user_role_mappings),
+            ('GET', 'groups', rf'{admin}/groups', self._groups),
+            ('POST', 'groups', rf'{admin}/groups', self._create_group),
+            ('GET', 'group_detail', rf'{admin}/groups/(?P<group_id>[^/]+)', self._group_detail),
+            ('DELETE', 'group_detail', rf'{admin}/groups/(?P<group_id>[^/]+)', self._delete_group),
+            ('POST', 'group_children', rf'{admin}/groups/(?P<group_id>[^/]+)/children', self._create_group),
+            ('POST', 'group_role_mappings', rf'{admin}/groups/(?P<group_id>[^/]+)/role-mappings/clients/[^/]+',
+             self._assign_group_roles),
+            ('GET', 'client_roles', rf'{admin}/clients/{client_pk}/roles', self._client_roles),
+            ('GET', 'role_by_id', rf'{admin}/roles-by-id/(?P<role_id>[^/]+)', self._role_by_id),
+        ]
+        for method, name, pattern, handler in routes:
+            self._routes.append((method, name, re.compile(f'^{pattern}$'), handler))
+
+    def dispatch(self, request: _FakeKeycloakRequestHandler) -> None:
+        parsed = urlparse(request.path)
+        for method, name, pattern, handler in self._routes:
+            match = pattern.match(parsed.path)
+            if match is None or method != request.command:
+                continue
+            with self._counts_lock:
+                self.request_counts[(method, name)] = self.request_counts.get((method, name), 0) + 1
+            failure_status = self.faults.apply(parsed.path)
+            body = request.read_body()
+            if failure_status:
+                request.send_json(failure_status, {'error': 'injected failure'})
+                return
+            query = {name: values[-1] for name, values in parse_qs(parsed.query).items()}
+            try:
+                status, data = handler(request, query=query, body=body, **match.groupdict())
+            except Exception as e:
+                status, data = 500, {'error': str(e)}
+            request.send_json(status, data)
+            return
+        request.read_body()
+        request.send_json(404, {'error': 'Not Found'})
+
+    def _bearer_claims(self, request: _FakeKeycloakRequestHandler) -> dict | None:
+        auth_header = request.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            return None
+        return self._decode(auth_header[len('Bearer '):])
+
+    def _admin(self, request: _FakeKeycloakRequestHandler) -> tuple[int, dict] | None:
+        if self._bearer_claims(request) is None:
+            return 401, {'error': 'HTTP 401 Unauthorized'}
+        return None
+
+    @staticmethod
+    def _form(body: bytes) -> dict:
+        return {name: values[-1] for name, values in parse_qs(body.decode()).items()}
+
+    @staticmethod
+    def _json(body: bytes) -> Any:
+        return json.loads(body) if body else None
+
+    # --- openid connect endpoints ---
+
+    def _token(self, request, body: bytes, **kwargs):
+        form = self._form(body)
+        if form.get('client_id') != self.client_id or form.get('client_secret') != self.client_secret:
+            return 401, {'error': 'unauthorized_client', 'error_description': 'Invalid client credentials'}
+        grant_type = form.get('grant_type')
+        if grant_type == 'client_credentials':
+            return 200, self.issue_tokens()
+        if grant_type == 'password':
+            user = self.realm.get_user_by_username(form.get('username', ''))
+            if user is None or self.realm.passwords.get(user['username']) != form.get('password'):
+                return 401, {'error': 'invalid_grant', 'error_description': 'Invalid user credentials'}
+            return 200, self.issue_tokens(user)
+        if grant_type == 'refresh_token':
+            claims = self._decode(form.get('refresh_token', ''))
+            user = self.realm.users.get(claims['sub']) if claims and claims.get('typ') == 'Refresh' else None
+            if user is None:
+                return 400, {'error': 'invalid_grant', 'error_description': 'Invalid refresh token'}
+            return 200, self.issue_tokens(user)
+        return 400, {'error': 'unsupported_grant_type'}
+
+    def _certs(self, request, **kwargs):
+        return 200, self.jwks
+
+    def _introspect(self, request, body: bytes, **kwargs):
+        form = self._form(body)
+        if form.get('client_id') != self.client_id or form.get('client_secret') != self.client_secret:
+            return 401, {'error': 'unauthorized_client'}
+        claims = self._decode(form.get('token', ''))
+        if claims is None:
+            return 200, {'active': False}
+        return 200, {**claims, 'active': True, 'client_id': claims.get('azp'), 'username': claims.get('preferred_username')}
+
+    def _userinfo(self, request, **kwargs):
+        claims = self._bearer_claims(request)
+        if claims is None:
+            return 401, {'error': 'invalid_token'}
+        user = self.realm.users.get(claims['sub'])
+        if user is None:
+            return 401, {'error': 'invalid_token'}
+        user_claims = self.realm.get_token_claims(user)
+        return 200, {name: user_claims[name] for name in (
+            'sub', 'preferred_username', 'email', 'email_verified', 'given_name', 'family_name', 'name', 'groups'
+        )}
+
+    def _logout(self, request, body: bytes, **kwargs):
+        form = self._form(body)
+        if form.get('refresh_token'):
+            self.revoked_tokens.add(form['refresh_token'])
+        return 204, None
+
+    # --- admin endpoints ---
+
+    def _users(self, request, query: dict, **kwargs):
+        if error := self._admin(request):
+            return error
+        users = sorted(self.realm.users.values(), key=lambda user: user['username'])
+        search = query.get('search') or query.get('username')
+        if search:
+            search = search.lower()
+            users = [
+                user for user in users
+                if any(search in str(user.get(field, '')).lower() for field in ('username', 'email', 'firstName', 'lastName'))
+            ]
+        if query.get('briefRepresentation') == 'true':
+            users = [{name: user[name] for name in ('id', 'username', 'firstName', 'lastName', 'email', 'enabled')}
+                     for user in users]
+        return 200, _page(users, query)
+
+    def _user_detail(self, request, user_id: str, **kwargs):
+        if error := self._admin(request):
+            return error
+        user = self.realm.users.get(user_id)
+        if user is None:
+            return 404, {'error': 'User not found'}
+        return 200, user
+
+    def _user_groups(self, request, user_id: str, query: dict, **kwargs):
+        if error := self._admin(request):
+            return error
+        if user_id not in self.realm.users:
+            return 404, {'error': 'User not found'}
+        groups = [{**group, 'subGroups': []} for group in self.realm.get_user_groups(user_id)]
+        return 200, _page(groups, query)
+
+    def _user_join_group(self, request, user_id: str, group_id: str, **kwargs):
+        if error := self._admin(request):
+            return error
+        if user_id not in self.realm.users or group_id not in self.realm.groups:
+            return 404, {'error': 'Could not find resource'}
+        self.realm.join_group(user_id, group_id)
+        return 204, None
+
+    def _user_role_mappings(self, request, user_id: str, **kwargs):
+        if error := self._admin(request):
+            return error
+        if user_id not in self.realm.users:
+            return 404, {'error': 'User not found'}
+        return 200, self.realm.get_role_mappings(user_id)
+
+    def _groups(self, request, query: dict, **kwargs):
+        if error := self._admin(request):
+            return error
+        groups = [group for group in self.realm.groups.values() if 'parentId' not in group]
+        search = query.get('search')
+        if search:
+            groups = [group for group in groups if search.lower() in group['name'].lower()]
+        groups = sorted(groups, key=lambda group: group['name'])
+        return 200, _page(groups, query)
+
+    def _group_detail(self, request, group_id: str, **kwargs):
+        if error := self._admin(request):
+            return error
+        group = self.realm.groups.get(group_id)
+        if group is None:
+            return 404, {'error': 'Could not find group by id'}
+        return 200, group
+
+    def _create_group(self, request, body: bytes, group_id: str | None = None, **kwargs):
+        if error := self._admin(request):
+            return error
+        data = self._json(body) or {}
+        if group_id and group_id not in self.realm.groups:
+            return 404, {'error': 'Could not find parent group'}
+        siblings = self.realm.groups[group_id]['subGroups'] if group_id else [
+            group for group in self.realm.groups.values() if 'parentId' not in group
+        ]
+        if any(group['name'] == data.get('name') for group in siblings):
+            return 409, {'errorMessage': f"Top level group named '{data.get('name')}' already exists."}
+        group = self.realm.add_group(data.get('name', ''), parent_id=group_id)
+        return 201, None if not group_id else group
+
+    def _delete_group(self, request, group_id: str, **kwargs):
+        if error := self._admin(request):
+            return error
+        if not self.realm.delete_group(group_id):
+            return 404, {'error': 'Could not find group by id'}
+        return 204, None
+
+    def _assign_group_roles(self, request, group_id: str, body: bytes, **kwargs):
+        if error := self._admin(request):
+            return error
+        if group_id not in self.realm.groups:
+            return 404, {'error': 'Could not find group by id'}
+        roles = self._json(body) or []
+        with self.realm.lock:
+            assigned = self.realm.group_client_roles.setdefault(group_id, [])
+            assigned.extend(role['id'] for role in roles if role.get('id') not in assigned)
+        return 204, None
+
+    def _client_roles(self, request, query: dict, **kwargs):
+        if error := self._admin(request):
+            return error
+        return 200, _page(list(self.realm.client_roles.values()), query)
+
+    def _role_by_id(self, request, role_id: str, **kwargs):
+        if error := self._admin(request):
+            return error
+        role = self.realm.client_roles.get(role_id) or self.realm.realm_roles.get(role_id)
+        if role is None:
+            return 404, {'error': 'Could not find role'}
+        return 200, role
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run a fake Keycloak realm for local development and tests.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--realm', default='main')
+    parser.add_argument('--client-id', default='back')
+    parser.add_argument('--client-secret', default='secret')
+    parser.add_argument('--client-pk', default='fake-client-pk')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--groups', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='ratio of requests answered with a 503')
+    args = parser.parse_args()
+
+    server = FakeKeycloakServer(
+        host=args.host,
+        port=args.port,
+        realm=args.realm,
+        client_id=args.client_id,
+        client_secret=args.client_secret,
+        client_pk=args.client_pk,
+        seed_users=args.users,
+        seed_groups=args.groups,
+        verbose=True,
+    )
+    server.faults.configure(latency=args.latency, failure_rate=args.failure_rate)
+    print(f'Fake Keycloak realm {args.realm} listening on {server.url}')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
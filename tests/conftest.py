@@ -0,0 +1,219 @@
+import asyncio
+import json
+import threading
+import time
+from http import HTTPStatus
+from types import SimpleNamespace
+from urllib.parse import parse_qsl, urlsplit
+
+import django
+import pytest
+import requests
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.conf import settings
+from jose import jwk, jwt
+from requests.adapters import HTTPAdapter
+
+from django_keycloak_sso.testing.fake_keycloak import FakeKeycloakServer
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+TEST_REALM = 'tests'
+TEST_CLIENT_ID = 'tests-back'
+TEST_CLIENT_SECRET = 'tests-secret'
+TEST_CLIENT_PK = 'tests-client-pk'
+
+fake_keycloak = FakeKeycloakServer(
+    realm=TEST_REALM,
+    client_id=TEST_CLIENT_ID,
+    client_secret=TEST_CLIENT_SECRET,
+    client_pk=TEST_CLIENT_PK,
+    seed_users=20,
+    seed_groups=3,
+)
+
+
+def pytest_configure(config):
+    # The package reads its settings at import time, the fake realm must be up first
+    fake_keycloak.start()
+    settings.configure(
+        SECRET_KEY='tests',
+        INSTALLED_APPS=[
+            'django.contrib.contenttypes',
+            'django.contrib.auth',
+            'rest_framework',
+            'django_keycloak_sso',
+        ],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        KEYCLOAK_SERVER_URL=fake_keycloak.url,
+        KEYCLOAK_ISSUER_PREFIX=fake_keycloak.url,
+        KEYCLOAK_REALM=TEST_REALM,
+        KEYCLOAK_CLIENT_ID=TEST_CLIENT_ID,
+        KEYCLOAK_CLIENT_PK=TEST_CLIENT_PK,
+        KEYCLOAK_CLIENT_TITLE=TEST_CLIENT_ID,
+        KEYCLOAK_CLIENT_NAME='tests',
+        KEYCLOAK_CLIENT_SECRET=TEST_CLIENT_SECRET,
+        KEYCLOAK_ALGORITHMS='RS256',
+        KEYCLOAK_JWKS_BACKGROUND_REFRESH=False,
+        ADMIN_GROUPS=[],
+        USE_TZ=True,
+    )
+    django.setup()
+
+
+def pytest_unconfigure(config):
+    fake_keycloak.stop()
+
+
+class SigningKey:
+    """
+    RSA key pair signing test tokens, ``jwk`` is its public JWK.
+    """
+
+    def __init__(self, kid: str):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.kid = kid
+        self.private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        self.jwk = {**jwk.construct(self.private_pem, 'RS256').public_key().to_dict(), 'kid': kid, 'use': 'sig'}
+
+    def sign(self, claims: dict) -> str:
+        return jwt.encode(claims, self.private_pem, algorithm='RS256', headers={'kid': self.kid})
+
+
+class KeycloakHTTPMock:
+    """
+    Answers the package HTTP calls (``requests`` and ``httpx``) from a route table
+    instead of the network. Routes are ``(method, endpoint)`` pairs, ``endpoint`` being
+    relative to the realm (``admin=False``) or to the admin API of the realm (``admin=True``),
+    like the endpoints of KeyCloakConfidentialClient. A route answers with a JSON body,
+    a ``(status, body)`` tuple, or a callable building one of them from the request.
+    Unknown routes answer 404.
+    """
+
+    def __init__(self):
+        from django_keycloak_sso.initializer import KeyCloakInitializer
+
+        self.panel_path = urlsplit(KeyCloakInitializer.base_panel_url).path
+        self.admin_path = urlsplit(KeyCloakInitializer.base_admin_url).path
+        self.signing_key = SigningKey('tests-key')
+        self.issuer = KeyCloakInitializer.issuer
+        self.routes: dict[tuple[str, str], tuple] = {}
+        self.requests: list[SimpleNamespace] = []
+        self._lock = threading.Lock()
+        self.add('GET', '/protocol/openid-connect/certs', lambda request: self.jwks)
+        self.add('POST', '/protocol/openid-connect/token', {'access_token': 'service-token', 'expires_in': 300})
+
+    @property
+    def jwks(self) -> dict:
+        return {'keys': [self.signing_key.jwk]}
+
+    @staticmethod
+    def new_signing_key(kid: str) -> SigningKey:
+        return SigningKey(kid)
+
+    def issue_token(self, signing_key: SigningKey = None, **claims) -> str:
+        now = int(time.time())
+        claims = {
+            'sub': 'user-id',
+            'preferred_username': 'user',
+            'aud': 'account',
+            'iss': self.issuer,
+            'iat': now,
+            'exp': now + 300,
+            **claims,
+        }
+        return (signing_key or self.signing_key).sign(claims)
+
+    def _path(self, endpoint: str, admin: bool) -> str:
+        return f"{self.admin_path if admin else self.panel_path}{endpoint}"
+
+    def add(self, method: str, endpoint: str, response, admin: bool = False, delay: float = 0) -> None:
+        self.routes[(method, self._path(endpoint, admin))] = (response, delay)
+
+    def count(self, method: str, endpoint: str, admin: bool = False) -> int:
+        path = self._path(endpoint, admin)
+        return sum(1 for request in self.requests if request.method == method and request.path == path)
+
+    def _dispatch(self, method: str, url: str, body: bytes | None) -> tuple[int, bytes, float]:
+        parts = urlsplit(url)
+        body = body.encode() if isinstance(body, str) else body or b''
+        request = SimpleNamespace(
+            method=method,
+            path=parts.path,
+            params=dict(parse_qsl(parts.query)),
+            form=dict(parse_qsl(body.decode(errors='replace'))),
+        )
+        with self._lock:
+            self.requests.append(request)
+        response, delay = self.routes.get((method, parts.path), ((404, {'error': 'Not Found'}), 0))
+        if callable(response):
+            response = response(request)
+        status, data = response if isinstance(response, tuple) else (200, response)
+        content = data if isinstance(data, bytes) else json.dumps(data).encode() if data is not None else b''
+        return status, content, delay
+
+    def send(self, adapter: HTTPAdapter, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        status, content, delay = self._dispatch(request.method, request.url, request.body)
+        time.sleep(delay)
+        response = requests.Response()
+        response.status_code = status
+        response.reason = HTTPStatus(status).phrase
+        response._content = content
+        response.headers['Content-Type'] = 'application/json'
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    async def handle_async_request(self, transport, request: "httpx.Request") -> "httpx.Response":
+        status, content, delay = self._dispatch(request.method, str(request.url), await request.aread())
+        await asyncio.sleep(delay)
+        return httpx.Response(status, content=content, headers={'Content-Type': 'application/json'}, request=request)
+
+
+@pytest.fixture
+def keycloak():
+    return fake_keycloak
+
+
+@pytest.fixture
+def keycloak_http(monkeypatch):
+    http_mock = KeycloakHTTPMock()
+    monkeypatch.setattr(HTTPAdapter, 'send', lambda adapter, request, **kwargs: http_mock.send(adapter, request))
+    if httpx is not None:
+        async def handle_async_request(transport, request):
+            return await http_mock.handle_async_request(transport, request)
+
+        monkeypatch.setattr(httpx.AsyncHTTPTransport, 'handle_async_request', handle_async_request)
+    return http_mock
+
+
+@pytest.fixture(autouse=True)
+def reset_keycloak_state():
+    from django.core.cache import cache
+    from django_keycloak_sso import keycloak as keycloak_module
+    from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+
+    client = KeyCloakConfidentialClient()
+    fake_keycloak.faults.reset()
+    fake_keycloak.reset_counts()
+    cache.clear()
+    keycloak_module._service_token = None
+    client.jwks_store.load({'keys': []})
+    client.jwks_store._last_unknown_kid_refetch = 0.0
+    client.verified_token_cache.clear()
+    client.rejected_token_cache.clear()
+    client.token_info_cache.clear()
+    client.circuit_breaker._close()
+    yield
+    fake_keycloak.faults.reset()
+    client.circuit_breaker._close()
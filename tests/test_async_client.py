@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from django_keycloak_sso.async_keycloak import AsyncKeyCloakClient
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+
+USERS = [{'id': 'user-0', 'username': 'user0'}, {'id': 'user-1', 'username': 'user1'}]
+GROUPS = [{'id': 'group-0', 'name': 'group0', 'subGroups': []}]
+ROLES = [{'id': 'role-0', 'name': 'role0'}]
+
+
+@pytest.fixture
+def admin_routes(keycloak_http):
+    keycloak_http.add('GET', '/users', USERS, admin=True)
+    keycloak_http.add('GET', '/users/user-0', USERS[0], admin=True)
+    keycloak_http.add('GET', '/groups', GROUPS, admin=True)
+    keycloak_http.add('GET', '/users/user-0/role-mappings', {'realmMappings': ROLES}, admin=True)
+    keycloak_http.add('GET', '/users/user-0/groups', GROUPS, admin=True)
+    keycloak_http.add('GET', f"/clients/{KeyCloakConfidentialClient.client_pk}/roles", ROLES, admin=True)
+    return keycloak_http
+
+
+@pytest.mark.parametrize('method, kwargs', [
+    ('_get_users', {}),
+    ('_get_users', {'detail_pk': 'user-0'}),
+    ('_get_groups', {}),
+    ('_get_user_roles', {'detail_pk': 'user-0'}),
+    ('_get_user_groups', {'detail_pk': 'user-0'}),
+    ('_get_client_roles', {}),
+])
+def test_async_reads_return_the_sync_payload(admin_routes, method, kwargs):
+    sync_data = getattr(KeyCloakConfidentialClient(), method)(**kwargs)
+    async_data = asyncio.run(getattr(AsyncKeyCloakClient(), method)(**kwargs))
+    assert async_data == sync_data
+
+
+@pytest.mark.parametrize('status, exception_class', [
+    (404, KeyCloakConfidentialClient.KeyCloakNotFoundException),
+    (401, KeyCloakConfidentialClient.KeyCloakException),
+    (500, KeyCloakConfidentialClient.KeyCloakException),
+])
+def test_async_errors_match_the_sync_errors(keycloak_http, status, exception_class):
+    keycloak_http.add('GET', '/users/user-0', (status, {'error': 'failed'}), admin=True)
+    with pytest.raises(exception_class) as sync_error:
+        KeyCloakConfidentialClient()._get_users(detail_pk='user-0')
+    with pytest.raises(exception_class) as async_error:
+        asyncio.run(AsyncKeyCloakClient()._get_users(detail_pk='user-0'))
+    assert type(async_error.value) is type(sync_error.value)
+    assert str(async_error.value) == str(sync_error.value)
+
+
+@pytest.mark.parametrize('method', ['_get_users', '_get_groups', '_get_user_roles', '_get_user_groups'])
+def test_async_empty_answer_errors_match_the_sync_errors(keycloak_http, method):
+    for endpoint in ('/users', '/groups', '/users/user-0/role-mappings', '/users/user-0/groups'):
+        keycloak_http.add('GET', endpoint, [], admin=True)
+    kwargs = {} if method in ('_get_users', '_get_groups') else {'detail_pk': 'user-0'}
+    with pytest.raises(KeyCloakConfidentialClient.KeyCloakException) as sync_error:
+        getattr(KeyCloakConfidentialClient(), method)(**kwargs)
+    with pytest.raises(KeyCloakConfidentialClient.KeyCloakException) as async_error:
+        asyncio.run(getattr(AsyncKeyCloakClient(), method)(**kwargs))
+    assert str(async_error.value) == str(sync_error.value)
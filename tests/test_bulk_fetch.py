@@ -0,0 +1,53 @@
+import pytest
+
+from django_keycloak_sso.caching import SSOCacheControlKlass
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+from django_keycloak_sso.sso.fields import SSOUserField
+from django_keycloak_sso.sso.sso import SSOKlass
+
+
+def _user(pk: str) -> dict:
+    return {'id': pk, 'username': pk}
+
+
+def test_empty_ids_are_never_requested(keycloak_http):
+    keycloak_http.add('GET', '/users/user-0', _user('user-0'), admin=True)
+    data, errors = SSOKlass().get_users_by_ids(['', None, 'user-0', 'user-0'])
+    assert data == {'user-0': _user('user-0')}
+    assert errors == {}
+    admin_requests = [request for request in keycloak_http.requests if request.path.startswith(keycloak_http.admin_path)]
+    assert [request.path for request in admin_requests] == [f"{keycloak_http.admin_path}/users/user-0"]
+
+
+def test_cached_ids_are_not_requested(keycloak_http):
+    for pk in ('user-0', 'user-1'):
+        keycloak_http.add('GET', f"/users/{pk}", _user(pk), admin=True)
+    SSOKlass().get_users_by_ids(['user-0'])
+    data, errors = SSOKlass().get_users_by_ids(['user-0', 'user-1'])
+    assert set(data) == {'user-0', 'user-1'}
+    assert keycloak_http.count('GET', '/users/user-0', admin=True) == 1
+    assert keycloak_http.count('GET', '/users/user-1', admin=True) == 1
+
+
+def test_failures_are_reported_per_id(keycloak_http):
+    keycloak_http.add('GET', '/users/user-0', _user('user-0'), admin=True)
+    keycloak_http.add('GET', '/users/broken', (500, {'error': 'failed'}), admin=True)
+    data, errors = SSOKlass().get_users_by_ids(['user-0', 'missing', 'broken'])
+
+    assert data == {'user-0': _user('user-0')}
+    assert set(errors) == {'missing', 'broken'}
+    assert isinstance(errors['missing'], KeyCloakConfidentialClient.KeyCloakNotFoundException)
+    assert isinstance(errors['broken'], KeyCloakConfidentialClient.KeyCloakException)
+    # Failures are not cached, the next call asks Keycloak again
+    for pk in ('missing', 'broken'):
+        assert SSOCacheControlKlass().get_cached_value(SSOKlass.SSOFieldTypeChoices.USER, pk) is None
+
+
+def test_empty_pk_has_no_cache_key():
+    with pytest.raises(ValueError):
+        SSOCacheControlKlass.get_cache_key(SSOKlass.SSOFieldTypeChoices.USER, '')
+
+
+def test_field_with_an_empty_id_makes_no_request(keycloak_http):
+    assert SSOUserField().get_full_data('').payload is None
+    assert keycloak_http.requests == []
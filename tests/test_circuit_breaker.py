@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+from django_keycloak_sso.circuit_breaker import CircuitBreakerKlass
+
+
+def _open_breaker(**kwargs) -> CircuitBreakerKlass:
+    breaker = CircuitBreakerKlass('tests', minimum_calls=1, window_size=1, open_duration=0.05, **kwargs)
+    breaker.record(False, 0)
+    assert breaker.state == CircuitBreakerKlass.CircuitStateChoices.OPEN
+    return breaker
+
+
+def test_opens_on_failure_rate_and_closes_after_good_probe():
+    breaker = CircuitBreakerKlass('tests', minimum_calls=4, window_size=4, open_duration=0.05)
+    for success in (True, False, True, False):
+        breaker.record(success, 0)
+    assert breaker.state == CircuitBreakerKlass.CircuitStateChoices.OPEN
+    with pytest.raises(CircuitBreakerKlass.CircuitOpenException):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CircuitBreakerKlass.CircuitStateChoices.CLOSED
+
+
+def test_half_open_probe_interrupted_by_base_exception_releases_the_slot():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        breaker.call(interrupted)
+    # Recorded as a failed probe instead of staying half open forever
+    assert breaker.state == CircuitBreakerKlass.CircuitStateChoices.OPEN
+    time.sleep(0.06)
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CircuitBreakerKlass.CircuitStateChoices.CLOSED
+
+
+def test_lost_probe_slot_is_released_after_the_probe_timeout():
+    breaker = _open_breaker(half_open_probe_timeout=0.05)
+    time.sleep(0.06)
+    breaker.before_call()  # probe whose outcome is never recorded
+    with pytest.raises(CircuitBreakerKlass.CircuitOpenException):
+        breaker.before_call()
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == CircuitBreakerKlass.CircuitStateChoices.HALF_OPEN
+
+
+def test_cancelled_async_probe_does_not_wedge_the_breaker(keycloak_http):
+    pytest.importorskip('httpx')
+    from django_keycloak_sso.async_keycloak import AsyncKeyCloakClient
+
+    client = AsyncKeyCloakClient()
+    breaker = client.circuit_breaker
+    breaker._open()
+    breaker.opened_at -= breaker.open_duration
+
+    async def scenario():
+        keycloak_http.add('GET', '/users', [{'id': 'user-0'}], admin=True, delay=0.5)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client._get_users(), 0.05)
+        keycloak_http.add('GET', '/users', [{'id': 'user-0'}], admin=True)
+        breaker.opened_at -= breaker.open_duration
+        return await client._get_users()
+
+    assert asyncio.run(scenario())
+    assert breaker.state == CircuitBreakerKlass.CircuitStateChoices.CLOSED
+
+
+def test_only_admin_calls_are_guarded(keycloak_http):
+    from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+
+    client = KeyCloakConfidentialClient()
+    client.circuit_breaker._open()
+    with pytest.raises(KeyCloakConfidentialClient.KeyCloakCircuitOpenException):
+        client._get_users()
+    # Token grants keep working while the admin API is cut off
+    assert client._post_password_access_token('user0', 'password')
@@ -0,0 +1,42 @@
+import pytest
+
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+
+
+def test_password_grant_issues_a_token_signed_with_the_published_keys(keycloak):
+    client = KeyCloakConfidentialClient()
+    token = client._post_password_access_token('user0', 'password')
+    claims = client.decode_token(token)
+    assert claims['preferred_username'] == 'user0'
+    assert claims['iss'] == keycloak.issuer
+    assert keycloak.count('token', 'POST') == 1
+
+
+def test_wrong_password_is_refused(keycloak):
+    with pytest.raises(KeyCloakConfidentialClient.KeyCloakException):
+        KeyCloakConfidentialClient()._post_password_access_token('user0', 'wrong')
+
+
+def test_admin_users_are_paged(keycloak):
+    users = list(KeyCloakConfidentialClient().iter_users(page_size=7))
+    assert len(users) == len(keycloak.realm.users)
+    assert keycloak.count('users') == 3
+
+
+def test_fail_next_injects_failures(keycloak):
+    client = KeyCloakConfidentialClient()
+    user_id = keycloak.realm.get_user_by_username('user0')['id']
+    client.get_cached_access_token()
+    keycloak.faults.fail_next(status=500)
+    with pytest.raises(KeyCloakConfidentialClient.KeyCloakException):
+        client._get_users(detail_pk=user_id)
+    assert client._get_users(detail_pk=user_id)['username'] == 'user0'
+    assert keycloak.count('user_detail') == 2
+
+
+def test_rotated_key_is_picked_up_by_the_client(keycloak):
+    client = KeyCloakConfidentialClient()
+    client.decode_token(keycloak.issue_user_token('user0'))
+    keycloak.rotate_signing_key()
+    assert client.decode_token(keycloak.issue_user_token('user1'))['preferred_username'] == 'user1'
+    assert keycloak.count('certs') == 2
@@ -0,0 +1,24 @@
+import pytest
+
+from django_keycloak_sso.sso.fields import CustomSSORelatedField, SSOGroupField, SSOUserField
+from django_keycloak_sso.sso.sso import SSOKlass
+
+
+def test_user_field_shares_the_bulk_resolver_cache(keycloak):
+    user_id = keycloak.realm.get_user_by_username('user0')['id']
+    assert SSOUserField().get_full_data(user_id).username == 'user0'
+    assert SSOUserField().get_full_data(user_id).username == 'user0'
+    # Already cached under the key get_users_by_ids reads
+    data, errors = SSOKlass().get_users_by_ids([user_id])
+    assert data[user_id]['username'] == 'user0'
+    assert keycloak.count('user_detail') == 1
+
+
+def test_missing_object_resolves_to_an_empty_object(keycloak):
+    assert SSOGroupField().get_full_data('missing').payload is None
+    assert keycloak.count('group_detail') == 1
+
+
+def test_unknown_sso_method_raises():
+    with pytest.raises(SSOKlass.SSOKlassException):
+        CustomSSORelatedField()._get_sso_field_value('user-0', 'get_unknown_data')
@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from django_keycloak_sso import http_client
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """
+    Answers 503 to the first GET then 200, and reads POST bodies slower than the client waits.
+    """
+
+    def _answer(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.hits.append('GET')
+        self._answer(503 if len(self.server.hits) == 1 else 200)
+
+    def do_POST(self):
+        self.server.hits.append('POST')
+        time.sleep(0.5)
+        self._answer(200)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    server.hits = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    http_client.reset_http_session()
+    yield
+    http_client.reset_http_session()
+
+
+def _url(server) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def test_session_is_shared_within_a_process():
+    assert http_client.get_http_session() is http_client.get_http_session()
+
+
+def test_forked_process_builds_its_own_session(monkeypatch):
+    parent_session = http_client.get_http_session()
+    monkeypatch.setattr(os, 'getpid', lambda: -1)
+    child_session = http_client.get_http_session()
+    assert child_session is not parent_session
+    assert http_client.get_http_session() is child_session
+
+
+def test_idempotent_request_is_retried_on_503(flaky_server):
+    response = http_client.get_http_session().get(_url(flaky_server), timeout=http_client.get_request_timeout())
+    assert response.status_code == 200
+    assert flaky_server.hits == ['GET', 'GET']
+
+
+def test_post_is_not_replayed_after_a_read_timeout(flaky_server):
+    with pytest.raises(requests.ReadTimeout):
+        http_client.get_http_session().post(_url(flaky_server), data={'grant_type': 'password'}, timeout=(1, 0.2))
+    time.sleep(0.5)
+    assert flaky_server.hits == ['POST']
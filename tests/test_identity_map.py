@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from django_keycloak_sso.middlewares import SSOIdentityMapMiddleware
+from django_keycloak_sso.sso.identity_map import get_identity_map, identity_map_scope
+from django_keycloak_sso.sso.sso import SSOKlass
+
+
+def test_scope_resolves_each_key_once():
+    calls = []
+    with identity_map_scope() as identity_map:
+        for _ in range(3):
+            assert identity_map.get_or_resolve('key', lambda: calls.append(1) or 'value') == 'value'
+        assert calls == [1]
+        assert identity_map.stats() == {'size': 1, 'hits': 2, 'misses': 1}
+    assert get_identity_map() is None
+
+
+def test_serializer_field_data_is_fetched_once_and_copied(keycloak):
+    sso_klass = SSOKlass()
+    user_id = keycloak.realm.get_user_by_username('user0')['id']
+    obj_ = SimpleNamespace(user=user_id)
+    with identity_map_scope():
+        first = sso_klass.get_serializer_field_data('user', SSOKlass.SSOFieldTypeChoices.USER, obj_)
+        first['changed'] = True
+        second = sso_klass.get_serializer_field_data('user', SSOKlass.SSOFieldTypeChoices.USER, obj_)
+    assert 'changed' not in second
+    assert second['username'] == 'user0'
+    assert keycloak.count('user_detail') == 1
+
+
+def test_middleware_scopes_the_map_to_the_request():
+    seen = {}
+
+    def view(request):
+        seen['map'] = get_identity_map()
+        return HttpResponse()
+
+    request = RequestFactory().get('/')
+    SSOIdentityMapMiddleware(view)(request)
+    assert seen['map'] is request.sso_identity_map
+    assert get_identity_map() is None
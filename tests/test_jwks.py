@@ -0,0 +1,68 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework.exceptions import AuthenticationFailed
+
+from django_keycloak_sso.jwks import JWKSKeyStore
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+from django_keycloak_sso.middlewares import KeycloakAuthentication, KeycloakMiddleware
+
+CERTS = '/protocol/openid-connect/certs'
+
+
+def test_token_is_verified_with_the_key_of_its_kid(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    token = keycloak_http.issue_token(preferred_username='user0')
+    assert client.decode_token(token)['preferred_username'] == 'user0'
+    assert client.decode_token(keycloak_http.issue_token())
+    assert keycloak_http.count('GET', CERTS) == 1
+
+
+def test_key_rotated_right_after_a_fetch_is_picked_up(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    client.jwks_store.refresh(force=True)
+    rotated_key = keycloak_http.new_signing_key('rotated-key')
+    keycloak_http.add('GET', CERTS, {'keys': [keycloak_http.signing_key.jwk, rotated_key.jwk]})
+
+    token = keycloak_http.issue_token(signing_key=rotated_key, preferred_username='user1')
+    assert client.decode_token(token)['preferred_username'] == 'user1'
+    assert keycloak_http.count('GET', CERTS) == 2
+
+
+def test_unknown_kid_refetches_are_rate_limited(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    client.jwks_store.refresh(force=True)
+    for kid in ('unknown-1', 'unknown-2'):
+        with pytest.raises(KeyCloakConfidentialClient.KeyCloakException):
+            client.decode_token(keycloak_http.issue_token(signing_key=keycloak_http.new_signing_key(kid)))
+    # Initial load and a single refetch for the unknown kids
+    assert keycloak_http.count('GET', CERTS) == 2
+
+
+def test_unknown_kid_while_certs_are_down_is_a_keycloak_error(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    client.jwks_store.refresh(force=True)
+    keycloak_http.add('GET', CERTS, (503, {'error': 'unavailable'}))
+    token = keycloak_http.issue_token(signing_key=keycloak_http.new_signing_key('unknown-kid'))
+
+    with pytest.raises(KeyCloakConfidentialClient.KeyCloakException):
+        client.decode_token(token)
+
+    request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    KeycloakMiddleware(lambda request_: HttpResponse()).process_request(request)
+    assert isinstance(request.user, AnonymousUser)
+
+    request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    with pytest.raises(AuthenticationFailed):
+        KeycloakAuthentication().authenticate(request)
+
+
+def test_expired_keys_are_served_when_their_refresh_fails(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    store = JWKSKeyStore(client.jwks_url, ttl=0)
+    store.refresh(force=True)
+    # Answered, but not with a usable key set
+    keycloak_http.add('GET', CERTS, {'keys': 'unavailable'})
+    assert store.get_key(keycloak_http.signing_key.kid)
+    assert keycloak_http.count('GET', CERTS) == 2
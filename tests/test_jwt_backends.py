@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+from django_keycloak_sso.jwt_backends import get_jwt_backend
+
+
+@pytest.fixture(params=['jose', 'pyjwt'])
+def backend(request):
+    return get_jwt_backend(request.param)
+
+
+def test_valid_token_is_accepted_by_every_backend(keycloak_http, backend):
+    key = backend.load_key(keycloak_http.signing_key.jwk)
+    token = keycloak_http.issue_token(preferred_username='user0')
+    claims = backend.decode(token, key, algorithms=['RS256'], audience='account', issuer=keycloak_http.issuer)
+    assert claims['preferred_username'] == 'user0'
+
+
+def test_slightly_future_iat_is_accepted_by_every_backend(keycloak_http, backend):
+    key = backend.load_key(keycloak_http.signing_key.jwk)
+    token = keycloak_http.issue_token(iat=int(time.time()) + 30)
+    assert backend.decode(token, key, algorithms=['RS256'], audience='account')
+
+
+def test_expired_and_not_yet_valid_tokens_are_rejected_by_every_backend(keycloak_http, backend):
+    key = backend.load_key(keycloak_http.signing_key.jwk)
+    with pytest.raises(backend.JWTExpiredException):
+        backend.decode(keycloak_http.issue_token(exp=int(time.time()) - 10), key, algorithms=['RS256'])
+    with pytest.raises(backend.JWTNotYetValidException):
+        backend.decode(keycloak_http.issue_token(nbf=int(time.time()) + 60), key, algorithms=['RS256'])
+
+
+def test_bad_audience_and_signature_are_rejected_by_every_backend(keycloak_http, backend):
+    key = backend.load_key(keycloak_http.signing_key.jwk)
+    with pytest.raises(backend.JWTBackendException):
+        backend.decode(keycloak_http.issue_token(aud='other'), key, algorithms=['RS256'], audience='account')
+    forged = keycloak_http.issue_token(signing_key=keycloak_http.new_signing_key(keycloak_http.signing_key.kid))
+    with pytest.raises(backend.JWTBackendException):
+        backend.decode(forged, key, algorithms=['RS256'])
@@ -0,0 +1,73 @@
+import logging
+
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+from django_keycloak_sso.metrics import BaseMetricsHook, KeyCloakMetricsKlass, keycloak_metrics
+
+
+class RecordingHook(BaseMetricsHook):
+    def __init__(self):
+        self.calls = []
+
+    def on_request(self, **kwargs):
+        self.calls.append(('request', kwargs))
+
+    def on_rejected(self, **kwargs):
+        self.calls.append(('rejected', kwargs))
+
+
+class RejectedOnlyHook(BaseMetricsHook):
+    def __init__(self):
+        self.reasons = []
+
+    def on_rejected(self, *, request_type, reason):
+        self.reasons.append(reason)
+
+
+class FailingHook(BaseMetricsHook):
+    def on_request(self, **kwargs):
+        raise RuntimeError("exporter is down")
+
+
+def test_keycloak_calls_are_recorded(keycloak_http):
+    keycloak_http.add('GET', '/users/user-0', {'id': 'user-0'}, admin=True)
+    keycloak_metrics.reset()
+    KeyCloakConfidentialClient()._get_users(detail_pk='user-0')
+
+    entry = keycloak_metrics.snapshot()[KeyCloakConfidentialClient.KeyCloakRequestTypeChoices.USERS]
+    assert entry['count'] == 1
+    assert entry['errors'] == 0
+    assert entry['status_codes'] == {200: 1}
+    assert entry['response_bytes'] > 0
+    assert sum(entry['latency_buckets'].values()) == 1
+    assert set(entry) >= {'rejected', 'error_classes', 'latency_sum', 'latency_max', 'latency_avg'}
+
+
+def test_hooks_get_every_call():
+    hook = RecordingHook()
+    metrics = KeyCloakMetricsKlass(hooks=[hook])
+    metrics.record('USERS', 0.01, status_code=503)
+    metrics.record_rejected('USERS', 'CircuitOpenException')
+
+    assert [kind for kind, _ in hook.calls] == ['request', 'rejected']
+    assert hook.calls[0][1]['status_code'] == 503
+    assert hook.calls[1][1] == {'request_type': 'USERS', 'reason': 'CircuitOpenException'}
+    assert metrics.snapshot()['USERS']['errors'] == 1
+    assert metrics.snapshot()['USERS']['rejected'] == 1
+
+
+def test_failing_hook_is_logged_and_does_not_break_the_call(caplog):
+    metrics = KeyCloakMetricsKlass(hooks=[FailingHook()])
+    with caplog.at_level(logging.ERROR, logger='django_keycloak_sso.metrics'):
+        metrics.record('USERS', 0.01, status_code=200)
+    assert metrics.snapshot()['USERS']['count'] == 1
+    assert 'exporter is down' in caplog.text
+
+
+def test_hook_may_implement_a_single_callback(caplog):
+    hook = RejectedOnlyHook()
+    metrics = KeyCloakMetricsKlass(hooks=[hook])
+    with caplog.at_level(logging.DEBUG, logger='django_keycloak_sso.metrics'):
+        metrics.record('USERS', 0.01, status_code=200)
+        metrics.record_rejected('USERS', 'CircuitOpenException')
+    assert hook.reasons == ['CircuitOpenException']
+    assert caplog.records == []
@@ -0,0 +1,72 @@
+import asyncio
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory
+from rest_framework.request import Request
+
+from django_keycloak_sso.jwks import JWKSKeyStore
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+from django_keycloak_sso.middlewares import KeycloakAuthentication, KeycloakMiddleware
+
+
+def _count_decodes(monkeypatch) -> list:
+    decoded = []
+    decode_token = KeyCloakConfidentialClient.decode_token
+
+    def spy(self, token, *args, **kwargs):
+        decoded.append(token)
+        return decode_token(self, token, *args, **kwargs)
+
+    monkeypatch.setattr(KeyCloakConfidentialClient, 'decode_token', spy)
+    return decoded
+
+
+def _request(token: str):
+    return RequestFactory().get('/', HTTP_AUTHORIZATION=f"Bearer {token}")
+
+
+def test_lazy_user_is_only_resolved_when_read(keycloak_http, monkeypatch):
+    monkeypatch.setattr(KeycloakMiddleware, 'lazy_user', True)
+    decoded = _count_decodes(monkeypatch)
+    request = _request(keycloak_http.issue_token(preferred_username='user0'))
+    KeycloakMiddleware(lambda request: HttpResponse())(request)
+    assert decoded == []
+
+    assert request.user.is_authenticated
+    assert request.user.username == 'user0'
+    assert len(decoded) == 1
+
+
+def test_drf_authentication_reuses_the_middleware_result(keycloak_http, monkeypatch):
+    decoded = _count_decodes(monkeypatch)
+    request = _request(keycloak_http.issue_token(preferred_username='user0'))
+    KeycloakMiddleware(lambda request: HttpResponse())(request)
+
+    user, _ = KeycloakAuthentication().authenticate(Request(request))
+    assert user is request.user
+    assert len(decoded) == 1
+
+
+def test_invalid_token_gives_an_anonymous_user(keycloak_http):
+    request = _request('not-a-token')
+    KeycloakMiddleware(lambda request: HttpResponse())(request)
+    assert isinstance(request.user, AnonymousUser)
+
+
+def test_async_middleware_resolves_the_user_in_the_event_loop(keycloak_http, monkeypatch):
+    def blocking_fetch(store):
+        raise AssertionError("the async path must not run the blocking key fetch")
+
+    monkeypatch.setattr(JWKSKeyStore, '_fetch', blocking_fetch)
+
+    async def get_response(request):
+        return HttpResponse()
+
+    request = AsyncRequestFactory().get(
+        '/', headers={'Authorization': f"Bearer {keycloak_http.issue_token(preferred_username='user0')}"}
+    )
+    asyncio.run(KeycloakMiddleware(get_response)(request))
+
+    assert request.user.username == 'user0'
+    assert asyncio.run(request.auser()) is request.user
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from django_keycloak_sso.async_keycloak import AsyncKeyCloakClient
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+
+
+def _paged(items: list):
+    def handler(request):
+        first, size = int(request.params['first']), int(request.params['max'])
+        return items[first:first + size]
+    return handler
+
+
+def _pages(keycloak_http) -> list[tuple[int, int]]:
+    path = f"{keycloak_http.admin_path}/users"
+    return [
+        (int(request.params['first']), int(request.params['max']))
+        for request in keycloak_http.requests if request.path == path
+    ]
+
+
+@pytest.mark.parametrize('total, expected_pages', [
+    (5, [(0, 2), (2, 2), (4, 2)]),
+    # A full last page needs one more (empty) page to see the end
+    (4, [(0, 2), (2, 2), (4, 2)]),
+    (0, [(0, 2)]),
+])
+def test_iter_users_walks_every_page(keycloak_http, total, expected_pages):
+    users = [{'id': f"user-{i}"} for i in range(total)]
+    keycloak_http.add('GET', '/users', _paged(users), admin=True)
+    assert list(KeyCloakConfidentialClient().iter_users(page_size=2)) == users
+    assert _pages(keycloak_http) == expected_pages
+
+
+def test_iter_users_stops_at_max_results(keycloak_http):
+    users = [{'id': f"user-{i}"} for i in range(10)]
+    keycloak_http.add('GET', '/users', _paged(users), admin=True)
+    assert list(KeyCloakConfidentialClient().iter_users(page_size=2, max_results=5)) == users[:5]
+    assert _pages(keycloak_http) == [(0, 2), (2, 2), (4, 1)]
+
+
+def test_extra_query_params_are_sent_with_every_page(keycloak_http):
+    keycloak_http.add('GET', '/users', _paged([{'id': 'user-0'}]), admin=True)
+    list(KeyCloakConfidentialClient().iter_users(page_size=2, search='user'))
+    assert keycloak_http.requests[-1].params['search'] == 'user'
+
+
+def test_aiter_users_pages_like_iter_users(keycloak_http):
+    users = [{'id': f"user-{i}"} for i in range(10)]
+    keycloak_http.add('GET', '/users', _paged(users), admin=True)
+
+    async def collect():
+        return [user async for user in AsyncKeyCloakClient().aiter_users(page_size=2, max_results=5)]
+
+    assert asyncio.run(collect()) == users[:5]
+    assert _pages(keycloak_http) == [(0, 2), (2, 2), (4, 1)]
@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection, models
+
+from django_keycloak_sso.sso import prefetch
+from django_keycloak_sso.sso.fields import SSOGroupField, SSOUserField
+from django_keycloak_sso.sso.meta import SSOModelMeta
+from django_keycloak_sso.sso.prefetch import SSOManager
+
+
+class Server(models.Model, metaclass=SSOModelMeta):
+    user = SSOUserField()
+    group = SSOGroupField(blank=True, null=True)
+
+    objects = SSOManager()
+
+    class Meta:
+        app_label = 'tests'
+
+
+@pytest.fixture
+def servers(keycloak):
+    user_ids = [keycloak.realm.get_user_by_username(f'user{i}')['id'] for i in range(3)]
+    with connection.schema_editor() as schema_editor:
+        schema_editor.create_model(Server)
+    # Two rows per user, next to each other
+    Server.objects.bulk_create([Server(user=user_id) for user_id in user_ids for _ in range(2)])
+    yield user_ids
+    with connection.schema_editor() as schema_editor:
+        schema_editor.delete_model(Server)
+
+
+def test_each_distinct_id_is_fetched_once(keycloak, servers):
+    rows = list(Server.objects.order_by('pk').prefetch_sso('user'))
+    assert keycloak.count('user_detail') == 3
+
+    assert [row.user_data.id for row in rows] == [user_id for user_id in servers for _ in range(2)]
+    assert keycloak.count('user_detail') == 3
+
+
+def test_cached_ids_are_not_fetched_again(keycloak, servers):
+    list(Server.objects.prefetch_sso('user'))
+    list(Server.objects.prefetch_sso('user'))
+    assert keycloak.count('user_detail') == 3
+
+
+def test_empty_fields_are_skipped(keycloak, servers):
+    rows = list(Server.objects.prefetch_sso())
+    assert keycloak.count('group_detail') == 0
+    assert all(row.group_data is None for row in rows)
+
+
+def test_iterator_prefetches_chunk_by_chunk(keycloak, servers, monkeypatch):
+    chunks = []
+    prefetch_sso = prefetch.prefetch_sso
+
+    def spy(instances, *field_names):
+        chunks.append([row.user for row in instances])
+        return prefetch_sso(instances, *field_names)
+
+    monkeypatch.setattr(prefetch, 'prefetch_sso', spy)
+    rows = list(Server.objects.order_by('pk').prefetch_sso('user').iterator(chunk_size=2))
+
+    assert chunks == [[user_id, user_id] for user_id in servers]
+    assert keycloak.count('user_detail') == 3
+    assert [row.user_data.id for row in rows] == [user_id for user_id in servers for _ in range(2)]
+    assert keycloak.count('user_detail') == 3
@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+
+
+def _is_rejected(client: KeyCloakConfidentialClient, token: str) -> bool:
+    return client.rejected_token_cache.get(client.rejected_token_cache.hash_key(token)) is not None
+
+
+def test_bad_signature_is_cached_as_rejected(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    forged = keycloak_http.issue_token(signing_key=keycloak_http.new_signing_key(keycloak_http.signing_key.kid))
+    with pytest.raises(KeyCloakConfidentialClient.KeyCloakException):
+        client.decode_token(forged)
+    assert _is_rejected(client, forged)
+
+    hits = client.rejected_token_cache.hits
+    with pytest.raises(KeyCloakConfidentialClient.KeyCloakException):
+        client.decode_token(forged)
+    assert client.rejected_token_cache.hits == hits + 1
+
+
+def test_malformed_and_expired_tokens_are_cached_as_rejected(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    expired = keycloak_http.issue_token(exp=int(time.time()) - 10)
+    for token in ('not-a-token', expired):
+        with pytest.raises(KeyCloakConfidentialClient.KeyCloakException):
+            client.decode_token(token)
+        assert _is_rejected(client, token)
+
+
+def test_not_yet_valid_token_is_not_cached_as_rejected(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    token = keycloak_http.issue_token(nbf=int(time.time()) + 60)
+    with pytest.raises(KeyCloakConfidentialClient.KeyCloakException):
+        client.decode_token(token)
+    assert not _is_rejected(client, token)
+
+
+def test_unknown_kid_is_not_cached_as_rejected(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    client.jwks_store.refresh(force=True)
+    keycloak_http.add('GET', '/protocol/openid-connect/certs', (503, {'error': 'unavailable'}))
+    token = keycloak_http.issue_token(signing_key=keycloak_http.new_signing_key('unknown-kid'))
+    with pytest.raises(KeyCloakConfidentialClient.KeyCloakException):
+        client.decode_token(token)
+    # The kid may be published once the certs endpoint is back
+    assert not _is_rejected(client, token)
@@ -0,0 +1,43 @@
+import threading
+import time
+
+from django_keycloak_sso import keycloak as keycloak_module
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+
+
+def _run_concurrently(target, count: int) -> list:
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_token_due_for_refresh_is_refreshed_once_in_the_background(keycloak):
+    now = time.time()
+    keycloak_module._service_token = {'access_token': 'current', 'expires_at': now + 60, 'refresh_at': now - 1}
+    keycloak.faults.configure(latency=0.2, path_contains='/token')
+    client = KeyCloakConfidentialClient()
+
+    # Nobody waits on the grant, the current token is still valid
+    assert _run_concurrently(client.get_cached_access_token, 20) == ['current'] * 20
+
+    deadline = time.monotonic() + 2
+    while keycloak_module._service_token['access_token'] == 'current' and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert keycloak_module._service_token['access_token'] != 'current'
+    assert keycloak.count('token', 'POST') == 1
+
+
+def test_expired_token_is_fetched_once_for_concurrent_callers(keycloak):
+    now = time.time()
+    keycloak_module._service_token = {'access_token': 'expired', 'expires_at': now - 1, 'refresh_at': now - 2}
+    keycloak.faults.configure(latency=0.2, path_contains='/token')
+    client = KeyCloakConfidentialClient()
+
+    tokens = _run_concurrently(client.get_cached_access_token, 10)
+    assert len(set(tokens)) == 1
+    assert tokens[0] != 'expired'
+    assert keycloak.count('token', 'POST') == 1
@@ -0,0 +1,48 @@
+import threading
+
+from django_keycloak_sso.caching import SingleFlightKlass
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    single_flight = SingleFlightKlass()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return 'done'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(single_flight.do('key', work)))
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=lambda: results.append(single_flight.do('key', work))) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+    assert calls == [1]
+    assert results == ['done'] * 6
+
+
+def test_concurrent_identical_admin_gets_share_one_request(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    user_id = 'user-0'
+    keycloak_http.add('GET', f'/users/{user_id}', {'id': user_id}, admin=True, delay=0.2)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client._get_users(detail_pk=user_id)))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 10
+    assert all(result['id'] == user_id for result in results)
+    assert keycloak_http.count('GET', f'/users/{user_id}', admin=True) == 1
@@ -0,0 +1,72 @@
+import pickle
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection, models
+
+from django_keycloak_sso.caching import SSODataList
+from django_keycloak_sso.sso.sso import SSOKlass
+
+
+class Membership(models.Model):
+    user = models.CharField(max_length=36, blank=True, null=True)
+
+    class Meta:
+        app_label = 'tests'
+
+
+@pytest.fixture
+def memberships():
+    with connection.schema_editor() as schema_editor:
+        schema_editor.create_model(Membership)
+    yield Membership
+    with connection.schema_editor() as schema_editor:
+        schema_editor.delete_model(Membership)
+
+
+def test_index_survives_pickling():
+    data = SSODataList([{'id': 'user-0', 'username': 'user0'}, {'id': 'user-1', 'username': 'user1'}])
+    restored = pickle.loads(pickle.dumps(data))
+    assert restored == data
+    assert restored.get_by_id('user-1') == {'id': 'user-1', 'username': 'user1'}
+    assert restored.get_by_id('user-2') is None
+
+
+def test_first_record_of_a_duplicated_id_is_kept():
+    data = SSODataList([{'id': 'user-0', 'username': 'first'}, {'id': 'user-0', 'username': 'second'}, 'no-id'])
+    assert data.get_by_id('user-0')['username'] == 'first'
+
+
+def test_queryset_is_not_evaluated(keycloak, memberships):
+    user_ids = [keycloak.realm.get_user_by_username(f'user{i}')['id'] for i in range(2)]
+    memberships.objects.bulk_create([memberships(user=user_id) for user_id in user_ids * 2] + [memberships(user='')])
+    queryset = memberships.objects.order_by('pk')
+
+    data = SSOKlass().get_sso_data_list(queryset, 'user', SSOKlass.SSOFieldTypeChoices.USER)
+    assert [record['id'] for record in data] == user_ids
+    assert queryset._result_cache is None
+    assert keycloak.count('user_detail') == 2
+
+
+def test_unsupported_input_gives_an_empty_list(keycloak):
+    assert SSOKlass().get_sso_data_list(None, 'user', SSOKlass.SSOFieldTypeChoices.USER) == []
+    with pytest.raises(ValueError):
+        SSOKlass().get_sso_data_list([], 'user', 'ROLE')
+
+
+def test_failed_ids_are_not_requested_again_per_row(keycloak):
+    sso_klass = SSOKlass()
+    user_id, broken_id = (keycloak.realm.get_user_by_username(f'user{i}')['id'] for i in range(2))
+    keycloak.faults.configure(failure_rate=1.0, failure_status=500, path_contains=f'/users/{broken_id}')
+    rows = [SimpleNamespace(user=pk) for pk in (user_id, broken_id, 'missing', user_id, broken_id, 'missing')]
+
+    list_data = sso_klass.get_sso_data_list(rows, 'user', SSOKlass.SSOFieldTypeChoices.USER)
+    assert list_data.failed_ids == {broken_id, 'missing'}
+    results = [
+        sso_klass.get_serializer_field_data('user', SSOKlass.SSOFieldTypeChoices.USER, row, list_data, get_from_list=True)
+        for row in rows
+    ]
+
+    assert results[0]['username'] == 'user0'
+    assert results[1:3] == [None, None]
+    assert keycloak.count('user_detail') == 3
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+
+INTROSPECT = '/protocol/openid-connect/token/introspect'
+USERINFO = '/protocol/openid-connect/userinfo'
+
+
+def test_introspection_is_cached(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    token = keycloak_http.issue_token()
+    keycloak_http.add('POST', INTROSPECT, {'active': True, 'sub': 'user-id'})
+    assert client._post_introspect_token(token)['active']
+    assert client._post_introspect_token(token)['active']
+    assert keycloak_http.count('POST', INTROSPECT) == 1
+
+
+def test_concurrent_introspections_share_one_request(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    token = keycloak_http.issue_token()
+    keycloak_http.add('POST', INTROSPECT, {'active': True, 'sub': 'user-id'}, delay=0.2)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client._post_introspect_token(token)))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 10
+    assert all(result['active'] for result in results)
+    assert keycloak_http.count('POST', INTROSPECT) == 1
+
+
+def test_user_info_is_not_cached_past_the_token_exp(keycloak_http, monkeypatch):
+    client = KeyCloakConfidentialClient()
+    exp = int(time.time()) + 5
+    token = keycloak_http.issue_token(exp=exp)
+    keycloak_http.add('GET', USERINFO, {'sub': 'user-id'})
+    client._get_user_info(token)
+    client._get_user_info(token)
+    assert keycloak_http.count('GET', USERINFO) == 1
+
+    # Still inside KEYCLOAK_TOKEN_INFO_CACHE_TTL, but after the token expired
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 10)
+    client._get_user_info(token)
+    assert keycloak_http.count('GET', USERINFO) == 2
+
+
+def test_introspection_is_not_cached_past_the_token_exp(keycloak_http, monkeypatch):
+    client = KeyCloakConfidentialClient()
+    exp = int(time.time()) + 5
+    token = keycloak_http.issue_token(exp=exp)
+    keycloak_http.add('POST', INTROSPECT, {'active': True, 'exp': exp})
+    client._post_introspect_token(token)
+
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 10)
+    client._post_introspect_token(token)
+    assert keycloak_http.count('POST', INTROSPECT) == 2
@@ -0,0 +1,51 @@
+import time
+
+from django_keycloak_sso.caching import LocalLRUCacheKlass
+from django_keycloak_sso.keycloak import KeyCloakConfidentialClient
+
+
+def test_repeated_token_is_served_from_the_cache(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    token = keycloak_http.issue_token()
+    client.decode_token(token)
+    hits = client.verified_token_cache.hits
+    assert client.decode_token(token)['sub'] == 'user-id'
+    assert client.verified_token_cache.hits == hits + 1
+
+
+def test_cached_claims_are_not_shared_between_callers(keycloak_http):
+    client = KeyCloakConfidentialClient()
+    token = keycloak_http.issue_token(realm_access={'roles': ['viewer']})
+    first = client.decode_token(token)
+    first['sub'] = 'changed'
+    second = client.decode_token(token)
+    second['realm_access']['roles'].append('admin')
+
+    third = client.decode_token(token)
+    assert third['sub'] == 'user-id'
+    assert third['realm_access'] == {'roles': ['viewer']}
+
+
+def test_entry_expires_at_the_token_exp(keycloak_http, monkeypatch):
+    client = KeyCloakConfidentialClient()
+    exp = int(time.time()) + 30
+    token = keycloak_http.issue_token(exp=exp)
+    token_hash = client.verified_token_cache.hash_key(token)
+    client.decode_token(token)
+    assert client.verified_token_cache.get(token_hash)
+
+    monkeypatch.setattr(time, 'time', lambda: exp + 1)
+    assert client.verified_token_cache.get(token_hash) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LocalLRUCacheKlass(maxsize=2)
+    expires_at = time.time() + 60
+    cache.set('a', 1, expires_at=expires_at)
+    cache.set('b', 2, expires_at=expires_at)
+    assert cache.get('a') == 1
+    cache.set('c', 3, expires_at=expires_at)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1